@@ -1,17 +1,32 @@
+import os
 from flask import Flask
+from jinja2 import FileSystemBytecodeCache
+from werkzeug.middleware.proxy_fix import ProxyFix
 from flask_mongoengine import MongoEngine
 from flask_login import LoginManager
 from flask_bcrypt import Bcrypt
 from config import Config
 from flask_mail import Mail
+from app.cache import TTLCache
+from app.passwords import PasswordHasher
+from app.metrics import QueryMetrics
+from app.ratelimit import RateLimiter
 
 # =======================
 # Extensions (GLOBAL)
 # =======================
 db = MongoEngine()
 bcrypt = Bcrypt()
+# bcrypt hashing bounded thread pool par (Config: BCRYPT_LOG_ROUNDS / BCRYPT_MAX_WORKERS)
+passwords = PasswordHasher(bcrypt)
 login_manager = LoginManager()
 mail = Mail()
+# load_user ke liye per-process cache (Config: USER_CACHE_SIZE / USER_CACHE_TTL)
+user_cache = TTLCache(config_prefix="USER_CACHE")
+# Per-endpoint MongoDB query metrics + N+1 detector (/metrics)
+query_metrics = QueryMetrics()
+# Login / reset / OTP throttling (Config: RATE_LIMITS, RATELIMIT_STORAGE)
+limiter = RateLimiter()
 
 # Login settings
 login_manager.login_view = "auth.login"
@@ -25,11 +40,26 @@ def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
 
+    # nginx ke peeche: request.remote_addr proxy ka nahi, client ka IP ho
+    proxies = app.config.get('TRUSTED_PROXY_COUNT', 0)
+    if proxies:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies, x_host=proxies)
+
+    if app.config.get('JINJA_BYTECODE_CACHE'):
+        cache_dir = os.path.join(app.instance_path, 'jinja_cache')
+        os.makedirs(cache_dir, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_dir)
+
     # Initialize extensions
+    # Note: CommandListener MongoClient banne se pehle register hona chahiye
+    query_metrics.init_app(app)
     db.init_app(app)
     bcrypt.init_app(app)
+    passwords.init_app(app)
     login_manager.init_app(app)
     mail.init_app(app)
+    user_cache.init_app(app)
+    limiter.init_app(app)
 
     # -----------------------
     # Register Blueprints
@@ -39,11 +69,34 @@ def create_app(config_class=Config):
     from app.routes.course import course_bp
     from app.routes.dashboard import dashboard_bp
     from app.routes.main import main_bp
+    from app.routes.uploads import uploads_bp
+    from app.routes.media import media_bp
+    from app.routes.metrics import metrics_bp
 
     app.register_blueprint(auth_bp, url_prefix="/auth")
     app.register_blueprint(course_bp, url_prefix="/courses")
     app.register_blueprint(dashboard_bp, url_prefix="/dashboard")
     app.register_blueprint(main_bp)
+    app.register_blueprint(uploads_bp, url_prefix="/uploads")
+    app.register_blueprint(media_bp, url_prefix="/media")
+    app.register_blueprint(metrics_bp)
+
+    from app.catalog import fragment_cache
+    fragment_cache.init_app(app)
+
+    # Profile pic / signature renditions + image_url() template global
+    from app.images import image_pipeline
+    image_pipeline.init_app(app)
+
+    # Video watch-position heartbeats (in-memory, batch flush)
+    from app.positions import position_buffer
+    position_buffer.init_app(app)
+
+    # -----------------------
+    # CLI (`flask lms ...`)
+    # -----------------------
+    from app.cli import lms_cli
+    app.cli.add_command(lms_cli)
 
     # Note: "/" route humesha main_bp handle karega, yahan extra route ki zaroorat nahi hai.
 
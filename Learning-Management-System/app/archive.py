@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+from app.models import Course, Lesson, Enrollment, UserProgress
+
+# Soft-deleted (is_active=False) courses aur unke lessons / enrollments / progress
+# ko <collection>_archive mein le jaate hain, taaki hot collections (aur unke
+# indexes) RAM mein rahein. Copy server-side $merge se hoti hai, phir delete;
+# beech mein crash ho toh dobara chalana safe hai ($merge replace karta hai).
+# Course sabse aakhir mein move hota hai - jab tak woh hot mein hai, job use dobara uthayega.
+
+# Course ke dependents: (Document, course field)
+DEPENDENTS = (
+    (Lesson, 'course'),
+    (Enrollment, 'course'),
+    (UserProgress, 'course'),
+)
+MOVE_CHUNK = 5000  # ek $merge / delete_many mein itne _ids
+
+
+def archive_name(document):
+    return f"{document._get_collection_name()}_archive"
+
+
+def archive_collection(document):
+    collection = document._get_db()[archive_name(document)]
+    if document is not Course:
+        collection.create_index('course')  # restore ke liye; pehle se hai toh no-op
+    return collection
+
+
+def _move(source, target_name, match):
+    """Copy matching docs into `target_name` server-side, then delete them from `source`."""
+    # Pehle _ids, phir $merge aur delete dono unhi ids par: beech mein jo naya
+    # document filter se match karne lage (e.g. abhi soft-delete hua course) woh
+    # bina archive hue delete nahi hota - agle run mein jaayega
+    ids = [doc['_id'] for doc in source.find(match, {'_id': 1})]
+    moved = 0
+    for i in range(0, len(ids), MOVE_CHUNK):
+        chunk = {'_id': {'$in': ids[i:i + MOVE_CHUNK]}}
+        source.aggregate([
+            {'$match': chunk},
+            {'$merge': {'into': target_name, 'on': '_id', 'whenMatched': 'replace', 'whenNotMatched': 'insert'}},
+        ])
+        moved += source.delete_many(chunk).deleted_count
+    return moved
+
+
+def archivable_course_ids(grace_days):
+    cutoff = datetime.utcnow() - timedelta(days=grace_days)
+    # deactivated_at nahi hai = purana soft delete (field se pehle ka) - woh bhi eligible
+    return Course._get_collection().distinct(
+        '_id', {'is_active': False, '$or': [{'deactivated_at': {'$lte': cutoff}}, {'deactivated_at': None}]}
+    )
+
+
+def archive_courses(grace_days=30, batch_size=100, dry_run=False, echo=print):
+    """Move inactive courses (and dependents) to the archive collections; returns moved counts."""
+    course_ids = archivable_course_ids(grace_days)
+    counts = {archive_name(document): 0 for document in (Course,) + tuple(d for d, _ in DEPENDENTS)}
+    if dry_run:
+        counts[archive_name(Course)] = len(course_ids)
+        for document, field in DEPENDENTS:
+            counts[archive_name(document)] = document._get_collection().count_documents({field: {'$in': course_ids}})
+        return counts
+
+    for i in range(0, len(course_ids), batch_size):
+        batch = course_ids[i:i + batch_size]
+        for document, field in DEPENDENTS:
+            archive_collection(document)
+            counts[archive_name(document)] += _move(
+                document._get_collection(), archive_name(document), {field: {'$in': batch}}
+            )
+        # Beech mein kisi ne course restore/activate kar diya toh woh yahin chhoot jaata hai
+        counts[archive_name(Course)] += _move(
+            Course._get_collection(), archive_name(Course), {'_id': {'$in': batch}, 'is_active': False}
+        )
+        echo(f"  archived {min(i + batch_size, len(course_ids))}/{len(course_ids)} course(s)")
+    return counts
+
+
+def restore_course(course_id, activate=False):
+    """Move one archived course and its dependents back; returns moved counts (None if not archived)."""
+    archived = archive_collection(Course)
+    if archived.count_documents({'_id': course_id}) == 0:
+        return None
+    counts = {}
+    # Ulta order: pehle dependents, phir course - course dikhe toh uska data bhi ho
+    for document, field in DEPENDENTS:
+        counts[document._get_collection_name()] = _move(
+            archive_collection(document), document._get_collection_name(), {field: course_id}
+        )
+    counts[Course._get_collection_name()] = _move(archived, Course._get_collection_name(), {'_id': course_id})
+    if activate:
+        Course.objects(id=course_id).update_one(set__is_active=True, unset__deactivated_at=True)
+    else:
+        # Grace period dobara shuru, warna agla archive run ise turant wapas le jaayega
+        Course.objects(id=course_id).update_one(set__deactivated_at=datetime.utcnow())
+    return counts
+
+
+def archived_file_references(references):
+    """Yield (folder, filename) for files used by archived docs; `references` as storage.FILE_REFERENCES."""
+    for document, field, folder in references:
+        if document is not Course and document not in dict(DEPENDENTS):
+            continue
+        collection = document._get_db()[archive_name(document)]
+        for filename in collection.distinct(field):
+            if filename:
+                yield folder, filename
@@ -0,0 +1,380 @@
+import itertools
+import platform
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from bson import ObjectId
+from flask import g
+from pymongo.uri_parser import parse_uri
+from app import limiter, passwords
+from app.models import User, Course, Lesson, Enrollment, UserProgress, CourseStats
+
+# `flask lms seed` (synthetic data) + `flask lms bench` (real routes, Flask test
+# client). Dono sirf local mongod ke liye hain: bench complete_lesson bhi chalata
+# hai jo progress likhta hai.
+
+BENCH_WORDS = (
+    'python flask mongodb database index query cache latency throughput algorithm graph tree '
+    'network security cloud docker kubernetes linux git testing design pattern async thread '
+    'process memory storage machine learning neural statistics calculus algebra physics '
+    'chemistry biology history economics marketing finance accounting writing grammar music '
+    'photography drawing animation video editing javascript react html css rust golang java'
+).split()
+
+SEED_EMAIL_DOMAIN = 'seed.learnhub.test'
+SEED_PASSWORD = 'seed-password'
+INSTRUCTOR_RATIO = 0.02
+COURSE_PRICES = (0, 0, 0, 199, 499, 999)
+POPULARITY_SKEW = 0.8  # Zipf-jaisa: kuch courses mein bahut zyada enrollments
+
+SCENARIOS = (
+    'main.home', 'courses.explore', 'courses.view_course',
+    'courses.complete_lesson', 'dashboard.student_index', 'auth.login',
+)
+
+
+def bench_text(rng, words):
+    return ' '.join(rng.choice(BENCH_WORDS) for _ in range(words))
+
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+def is_local_database(app):
+    host = (app.config.get('MONGODB_SETTINGS') or {}).get('host')
+    if not host:
+        return True  # pymongo default: localhost:27017
+    nodes = parse_uri(host)['nodelist'] if '://' in host else [(host.split(':')[0], None)]
+    return all(node in ('localhost', '127.0.0.1', '::1') for node, _ in nodes)
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+# --- Seeder ---
+
+def seed_database(users, courses, lessons_per_course, enrollments, batch_size=10000, seed=1, echo=print):
+    """Bulk-insert a synthetic catalog; returns the number of documents per collection.
+
+    Documents raw dicts hain (field names models.py wale) - lakhon Documents
+    banana insert se zyada slow padta. Har run ka apna username token hota hai,
+    isliye seed dobara chalane par unique indexes nahi takraate.
+    """
+    rng = random.Random(seed)
+    token = uuid.uuid4().hex[:4]
+    now = datetime.utcnow()
+    # Sab users ka ek hi password: bcrypt sirf ek baar (configured cost par)
+    hashed = passwords.hash(SEED_PASSWORD)
+
+    instructor_total = max(1, int(users * INSTRUCTOR_RATIO)) if courses else 0
+    user_ids = [ObjectId() for _ in range(users)]
+    instructor_ids, student_ids = user_ids[:instructor_total], user_ids[instructor_total:]
+    for chunk in _chunks(list(enumerate(user_ids)), batch_size):
+        User._get_collection().insert_many([{
+            '_id': user_id,
+            'username': f's{token}{i}',
+            'email': f's{token}{i}@{SEED_EMAIL_DOMAIN}',
+            'password': hashed,
+            'image_file': 'default.jpg',
+            'role': 'instructor' if i < instructor_total else 'student',
+        } for i, user_id in chunk], ordered=False)
+    echo(f"  users        {len(user_ids)}")
+
+    course_docs = []
+    for _ in range(courses if instructor_ids else 0):
+        posted = now - timedelta(minutes=rng.randint(0, 2 * 365 * 24 * 60))
+        course_docs.append({
+            '_id': ObjectId(),
+            'title': bench_text(rng, rng.randint(3, 6)).title(),
+            'description': bench_text(rng, rng.randint(40, 200)),
+            'date_posted': posted,
+            'date_created': posted,
+            'is_active': True,
+            'is_hidden': False,
+            'instructor': rng.choice(instructor_ids),
+            'certificate_enabled': rng.random() < 0.3,
+            'price': rng.choice(COURSE_PRICES),
+            'lesson_count': lessons_per_course,
+            'outline': [{
+                'lesson_id': ObjectId(),
+                'title': bench_text(rng, rng.randint(3, 7)).capitalize(),
+                'position': n,
+                'has_video': False,
+                'has_resource': False,
+            } for n in range(1, lessons_per_course + 1)],
+        })
+    for chunk in _chunks(course_docs, batch_size):
+        Course._get_collection().insert_many(chunk, ordered=False)
+    echo(f"  courses      {len(course_docs)}")
+
+    lesson_total = 0
+    for chunk in _chunks(course_docs, max(1, batch_size // max(1, lessons_per_course))):
+        lessons = [{
+            '_id': entry['lesson_id'],
+            'title': entry['title'],
+            'content': bench_text(rng, rng.randint(50, 150)),
+            'course': course['_id'],
+            'date_created': course['date_created'] + timedelta(minutes=entry['position']),
+        } for course in chunk for entry in course['outline']]
+        if lessons:
+            Lesson._get_collection().insert_many(lessons, ordered=False)
+            lesson_total += len(lessons)
+    echo(f"  lessons      {lesson_total}")
+
+    # Unique (student, course) pairs; popular courses zyada baar chune jaate hain
+    enrollment_total = min(enrollments, len(student_ids) * len(course_docs))
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) ** POPULARITY_SKEW for rank in range(len(course_docs))))
+    seen, inserted = set(), 0
+    while inserted < enrollment_total:
+        docs = []
+        want = min(batch_size, enrollment_total - inserted)
+        picks = rng.choices(range(len(course_docs)), cum_weights=cum_weights, k=want)
+        for course_index in picks:
+            student_index = rng.randrange(len(student_ids))
+            if (student_index, course_index) in seen:
+                continue
+            seen.add((student_index, course_index))
+            course = course_docs[course_index]
+            roll = rng.random()
+            docs.append({
+                'student': student_ids[student_index],
+                'course': course['_id'],
+                'date_enrolled': course['date_posted'] + (now - course['date_posted']) * rng.random(),
+                'progress': 0 if roll < 0.3 else 100 if roll > 0.8 else rng.randint(1, 99),
+                'amount_paid': course['price'],
+                'payment_status': 'completed',
+            })
+        if docs:
+            Enrollment._get_collection().insert_many(docs, ordered=False)
+            inserted += len(docs)
+            echo(f"  enrollments  {inserted}/{enrollment_total}")
+
+    CourseStats.rebuild()
+    return {'users': len(user_ids), 'courses': len(course_docs), 'lessons': lesson_total, 'enrollments': inserted}
+
+
+def remove_seed_data():
+    """Delete everything a previous `flask lms seed` created; returns deleted user count."""
+    seeded = {'email': {'$regex': f'@{SEED_EMAIL_DOMAIN.replace(".", "[.]")}$'}}
+    user_ids = User._get_collection().distinct('_id', seeded)
+    course_ids = Course.objects(instructor__in=user_ids).distinct('id') if user_ids else []
+    for chunk in _chunks(course_ids, 5000):
+        Lesson.objects(course__in=chunk).delete()
+        Enrollment.objects(course__in=chunk).delete()
+        UserProgress.objects(course__in=chunk).delete()
+        Course.objects(id__in=chunk).delete()
+    for chunk in _chunks(user_ids, 5000):
+        Enrollment.objects(student__in=chunk).delete()
+        UserProgress.objects(student__in=chunk).delete()
+    User._get_collection().delete_many(seeded)
+    CourseStats.rebuild()
+    return len(user_ids)
+
+
+# --- Route benchmark ---
+
+def _pick_fixtures(sample_size=200):
+    # Seeded students (password pata hai) + unka ek enrolled course + us course ke lessons
+    students = {
+        row['_id']: row['email'] for row in User._get_collection().aggregate([
+            {'$match': {'role': 'student', 'email': {'$regex': f'@{SEED_EMAIL_DOMAIN.replace(".", "[.]")}$'}}},
+            {'$sample': {'size': sample_size * 5}},
+            {'$project': {'email': 1}},
+        ])
+    }
+    enrollments = {}
+    for row in Enrollment._get_collection().find({'student': {'$in': list(students)}}, {'student': 1, 'course': 1}):
+        enrollments.setdefault(row['student'], row['course'])
+    lessons = {}
+    for row in Lesson._get_collection().find({'course': {'$in': list(set(enrollments.values()))}}, {'course': 1}):
+        lessons.setdefault(row['course'], []).append(str(row['_id']))
+    return [
+        {'email': students[student_id], 'course_id': str(course_id), 'lesson_ids': lessons[course_id]}
+        for student_id, course_id in enrollments.items() if course_id in lessons
+    ][:sample_size]
+
+
+def _login(client, fixture):
+    return client.post('/auth/login', data={'email': fixture['email'], 'password': SEED_PASSWORD})
+
+
+# name -> (request, expected status)
+REQUESTS = {
+    'main.home': (lambda client, fixture, rng: client.get('/'), 200),
+    'courses.explore': (lambda client, fixture, rng: client.get('/courses/explore'), 200),
+    'courses.view_course': (lambda client, fixture, rng: client.get(f"/courses/{fixture['course_id']}"), 200),
+    'courses.complete_lesson': (
+        lambda client, fixture, rng: client.post(f"/courses/lesson/{rng.choice(fixture['lesson_ids'])}/complete"), 200),
+    'dashboard.student_index': (lambda client, fixture, rng: client.get('/dashboard/student'), 200),
+    'auth.login': (lambda client, fixture, rng: _login(client, fixture), 302),
+}
+
+
+class RouteBenchmark:
+    """Drives real routes through `app.test_client()` from `concurrency` threads."""
+
+    def __init__(self, app, concurrency=8, warmup=5):
+        self.app = app
+        self.concurrency = concurrency
+        self.warmup = warmup
+        self._local = threading.local()
+        self.fixtures = _pick_fixtures()
+        if not self.fixtures:
+            raise ValueError("No seeded students with enrollments found; run `flask lms seed` first.")
+        if not app.config.get('QUERY_METRICS_ENABLED', True):
+            raise ValueError("QUERY_METRICS_ENABLED must be on to count queries per request.")
+        # Forms ka CSRF token test client ke paas nahi hota
+        app.config['WTF_CSRF_ENABLED'] = False
+        # Saare threads ek hi IP (127.0.0.1) se login karte hain - limiter bench ko 429 de deta
+        limiter.enabled = False
+        # QueryMetrics ke teardown se pehle chalta hai (teardowns ulte order mein)
+        app.teardown_request(self._record_queries)
+
+    def _record_queries(self, exc=None):
+        self._local.queries = g.get('query_count', 0)
+
+    def _worker(self, name, index, count):
+        make_request, expected = REQUESTS[name]
+        rng = random.Random(index)
+        fixture = self.fixtures[index % len(self.fixtures)]
+        client = self.app.test_client()
+        if name != 'auth.login':
+            _login(client, fixture)
+        samples = []
+        for n in range(self.warmup + count):
+            if name == 'auth.login':
+                client = self.app.test_client()  # har login naye (anonymous) session se
+            start = time.perf_counter()
+            response = make_request(client, fixture, rng)
+            elapsed = time.perf_counter() - start
+            if n >= self.warmup:
+                samples.append((elapsed * 1000, self._local.queries, response.status_code == expected))
+        return samples
+
+    def run_scenario(self, name, total):
+        shares = [total // self.concurrency + (i < total % self.concurrency) for i in range(self.concurrency)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            results = list(pool.map(lambda args: self._worker(name, *args), enumerate(shares)))
+        wall = time.perf_counter() - start
+        samples = [s for worker in results for s in worker]
+        latencies = [s[0] for s in samples]
+        queries = [s[1] for s in samples]
+        return {
+            'requests': len(samples),
+            'errors': sum(1 for s in samples if not s[2]),
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'mean_ms': round(sum(latencies) / len(latencies), 2),
+            'requests_per_sec': round(len(samples) / wall, 1),
+            'queries_per_request': round(sum(queries) / len(queries), 2),
+            'max_queries': max(queries),
+        }
+
+    def run(self, scenarios=SCENARIOS, requests_per_scenario=200, echo=print):
+        results = {}
+        for name in scenarios:
+            results[name] = self.run_scenario(name, requests_per_scenario)
+            echo(format_row(name, results[name]))
+        return {
+            'meta': {
+                'created_at': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+                'concurrency': self.concurrency,
+                'requests_per_scenario': requests_per_scenario,
+                'bcrypt_log_rounds': self.app.config.get('BCRYPT_LOG_ROUNDS'),
+                'python': platform.python_version(),
+                'data': {
+                    'users': User._get_collection().estimated_document_count(),
+                    'courses': Course._get_collection().estimated_document_count(),
+                    'lessons': Lesson._get_collection().estimated_document_count(),
+                    'enrollments': Enrollment._get_collection().estimated_document_count(),
+                },
+            },
+            'scenarios': results,
+        }
+
+
+def format_row(name, result):
+    return (f"{name:<26} p50 {result['p50_ms']:>8.1f}  p95 {result['p95_ms']:>8.1f}  "
+            f"p99 {result['p99_ms']:>8.1f} ms  {result['requests_per_sec']:>7.1f} req/s  "
+            f"{result['queries_per_request']:>5.1f} q/req  errors {result['errors']}")
+
+
+def compare_runs(baseline, current, tolerance=0.2):
+    """Return human-readable regressions of `current` against a `baseline` run."""
+    regressions = []
+    for name, result in current['scenarios'].items():
+        base = baseline.get('scenarios', {}).get(name)
+        if base is None:
+            continue
+        if result['p95_ms'] > base['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']} -> {result['p95_ms']} ms")
+        # Query count deterministic hai - koi bhi badhotri (e.g. naya N+1) regression hai
+        if result['queries_per_request'] > base['queries_per_request'] + 0.5:
+            regressions.append(
+                f"{name}: queries/request {base['queries_per_request']} -> {result['queries_per_request']}")
+        if result['errors'] > base.get('errors', 0):
+            regressions.append(f"{name}: errors {base.get('errors', 0)} -> {result['errors']}")
+    return regressions
+
+
+# --- Enrollment concurrency check (`flask lms bench-enroll`) ---
+
+def hammer_enrollment(app, students=20, parallel=16, repeats=4):
+    """Fire duplicate enroll/payment POSTs in parallel; returns (requests sent, list of problems).
+
+    Do temporary hidden courses (free + paid) banate hain, har student ke liye
+    dono endpoints `repeats` baar parallel hit karte hain, phir check: har
+    (student, course) ka exactly ek Enrollment aur CourseStats bhi utna hi.
+    """
+    student_ids = User._get_collection().distinct('_id', {
+        'role': 'student', 'email': {'$regex': f'@{SEED_EMAIL_DOMAIN.replace(".", "[.]")}$'},
+    })[:students]
+    if not student_ids:
+        raise ValueError("No seeded students found; run `flask lms seed` first.")
+    app.config['WTF_CSRF_ENABLED'] = False
+
+    free = Course(title='[bench] enroll free', description='bench', is_hidden=True, price=0).save()
+    paid = Course(title='[bench] enroll paid', description='bench', is_hidden=True, price=499).save()
+    urls = (f'/courses/course/{free.id}/enroll', f'/courses/payment/{paid.id}/process')
+    jobs = [(student_id, url) for student_id in student_ids for url in urls for _ in range(repeats)]
+    random.Random(7).shuffle(jobs)
+
+    def post(job):
+        # Har request ka apna client; login seedha session mein (bcrypt ki zaroorat nahi)
+        student_id, url = job
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(student_id)
+            session['_fresh'] = True
+        return client.post(url).status_code
+
+    try:
+        with ThreadPoolExecutor(max_workers=parallel) as pool:
+            statuses = list(pool.map(post, jobs))
+
+        problems = [f"{statuses.count(code)} request(s) returned {code}" for code in sorted(set(statuses)) if code >= 500]
+        for course in (free, paid):
+            rows = Enrollment.objects(course=course.id).count()
+            stats = CourseStats.objects(course_id=course.id).first()
+            label = 'paid' if course.price else 'free'
+            if rows != len(student_ids):
+                problems.append(f"{label}: {rows} enrollment rows for {len(student_ids)} students")
+            if stats is None or stats.enrollment_count != rows:
+                problems.append(f"{label}: stats count {stats.enrollment_count if stats else 0} != {rows} rows")
+            elif stats.revenue != course.price * rows:
+                problems.append(f"{label}: stats revenue {stats.revenue} != {course.price * rows}")
+        return len(jobs), problems
+    finally:
+        course_ids = [free.id, paid.id]
+        Enrollment.objects(course__in=course_ids).delete()
+        CourseStats.objects(course_id__in=course_ids).delete()
+        Course.objects(id__in=course_ids).delete()
@@ -0,0 +1,64 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Small thread-safe LRU cache whose entries also expire after `ttl` seconds.
+
+    Per-process hota hai (har gunicorn worker ka apna), isliye writes ke baad
+    `invalidate()` call karna zaroori hai.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60, config_prefix=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.config_prefix = config_prefix
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        # e.g. USER_CACHE_SIZE / USER_CACHE_TTL
+        if self.config_prefix:
+            self.maxsize = app.config.get(f'{self.config_prefix}_SIZE', self.maxsize)
+            self.ttl = app.config.get(f'{self.config_prefix}_TTL', self.ttl)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+        }
@@ -0,0 +1,86 @@
+import re
+import threading
+import time
+from flask import current_app, render_template, get_template_attribute
+from markupsafe import Markup
+from app.cache import TTLCache
+from app.models import Course, Counter
+from app.read_models import course_cards
+from app.pagination import keyset_page
+
+# Public catalog (home + explore) ke rendered fragments.
+# Key mein catalog version hota hai, isliye write routes sirf version bump karte hain
+# aur purane fragments apne aap bekaar ho jaate hain.
+CATALOG_COUNTER = 'catalog_version'
+fragment_cache = TTLCache(maxsize=64, ttl=3600, config_prefix='CATALOG_CACHE')
+
+_ACTION_MARKER = re.compile(r'<!--course-action:(\w+)-->')
+_version_lock = threading.Lock()
+_version = {'value': None, 'checked_at': 0.0}
+
+
+def catalog_version():
+    # Mongo se version har CATALOG_VERSION_TTL seconds mein ek baar hi padhte hain
+    ttl = current_app.config.get('CATALOG_VERSION_TTL', 5)
+    now = time.monotonic()
+    if _version['value'] is None or now - _version['checked_at'] > ttl:
+        value = Counter.current(CATALOG_COUNTER)
+        with _version_lock:
+            _version['value'], _version['checked_at'] = value, now
+    return _version['value']
+
+
+def bump_catalog_version():
+    """Call after any write that changes what the public catalog shows."""
+    value = Counter.increment(CATALOG_COUNTER)
+    with _version_lock:
+        _version['value'], _version['checked_at'] = value, time.monotonic()
+    return value
+
+
+def _cached(key_parts, builder):
+    key = key_parts + (catalog_version(),)
+    fragment = fragment_cache.get(key)
+    if fragment is None:
+        fragment = builder()
+        fragment_cache.set(key, fragment)
+    return fragment
+
+
+def public_courses():
+    return Course.objects(is_active=True, is_hidden=False)
+
+
+def public_course_ids():
+    """Ids of every visible course (cached per catalog version), e.g. for lesson search filters."""
+    return _cached(('public_ids',), lambda: list(public_courses().scalar('id')))
+
+
+def home_grid():
+    def build():
+        courses = course_cards(public_courses().order_by('-date_posted', '-id').limit(6))
+        return render_template('partials/home_grid.html', courses=courses)
+    return Markup(_cached(('home',), build))
+
+
+def explore_grid(enrolled_ids, after=None):
+    """One page of the shared explore grid with the per-user buttons overlaid.
+
+    Returns `(html, next_cursor)`.
+    """
+    def build():
+        courses, next_cursor = keyset_page(
+            public_courses(), 'date_posted', after,
+            per_page=current_app.config['COURSES_PER_PAGE'], loader=course_cards
+        )
+        course_action = get_template_attribute('partials/course_action.html', 'course_action')
+        actions = {
+            str(course.id): (str(course_action(course, False)), str(course_action(course, True)))
+            for course in courses
+        }
+        return render_template('partials/explore_grid.html', courses=courses), actions, next_cursor
+
+    grid, actions, next_cursor = _cached(('explore', after), build)
+    enrolled = {str(course_id) for course_id in enrolled_ids}
+    html = _ACTION_MARKER.sub(lambda m: actions[m.group(1)][m.group(1) in enrolled], grid)
+    return Markup(html), next_cursor
@@ -0,0 +1,94 @@
+import os
+import shutil
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from flask import current_app, render_template
+from app.models import Course, Enrollment, prefetch
+
+# Certificates ek baar render hokar instance/certificates/<course_id>/<student_id>.html
+# mein save hote hain; uske baad har view seedha disk se serve hota hai.
+# Course title, certificate toggle ya instructor ka naam/signature badle toh
+# us course ke saare artifacts invalidate ho jaate hain.
+
+
+def artifact_dir(course_id):
+    return os.path.join(current_app.instance_path, 'certificates', str(course_id))
+
+
+def artifact_path(course_id, student_id):
+    return os.path.join(artifact_dir(course_id), f"{student_id}.html")
+
+
+def render_certificate(student, course, date):
+    # student/course Documents ya plain dicts dono chalenge (Jinja dono padh leta hai)
+    return render_template('certificate.html', student=student, course=course,
+                           date=date.strftime("%d %B, %Y"))
+
+
+def write_artifact(course_id, student_id, html):
+    os.makedirs(artifact_dir(course_id), exist_ok=True)
+    path = artifact_path(course_id, student_id)
+    tmp_path = f"{path}.tmp-{uuid.uuid4().hex}"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(html)
+    os.replace(tmp_path, path)
+    return path
+
+
+def invalidate_course(course_id):
+    shutil.rmtree(artifact_dir(course_id), ignore_errors=True)
+
+
+def invalidate_instructor(instructor_id):
+    for course_id in Course.objects(instructor=instructor_id).scalar('id'):
+        invalidate_course(course_id)
+
+
+# --- Batch generation (`flask lms certificates --course <id>`) ---
+
+_worker_app = None
+
+
+def _init_worker():
+    # Har process ka apna app; rendering ke liye DB ki zaroorat nahi padti
+    global _worker_app
+    from app import create_app
+    _worker_app = create_app()
+
+
+def _render_chunk(jobs):
+    with _worker_app.test_request_context():
+        for course, student, date in jobs:
+            write_artifact(course['id'], student['id'], render_certificate(student, course, date))
+    return len(jobs)
+
+
+def generate_for_course(course_id, workers=None, chunk_size=200):
+    """Pre-render certificates for every 100%-progress enrollment of a course."""
+    course = Course.objects.get(id=course_id)
+    if not course.certificate_enabled:
+        return 0
+    instructor = course.instructor
+    course_data = {
+        'id': str(course.id),
+        'title': course.title,
+        'instructor': {
+            'username': instructor.username if instructor else '',
+            'signature_filename': instructor.signature_filename if instructor else None,
+        },
+    }
+
+    enrollments = prefetch(Enrollment.objects(course=course.id, progress__gte=100), 'student')
+    issued = datetime.now()
+    jobs = [
+        (course_data, {'id': str(e.student.id), 'username': e.student.username}, issued)
+        for e in enrollments
+        if e.student and not os.path.exists(artifact_path(course.id, e.student.id))
+    ]
+    chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+    if not chunks:
+        return 0
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        return sum(pool.map(_render_chunk, chunks))
@@ -0,0 +1,600 @@
+import csv
+import json
+import os
+import random
+import re
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+import bcrypt as bcrypt_lib
+import click
+from bson import ObjectId
+from flask import current_app
+from flask.cli import AppGroup
+from mongoengine.queryset.visitor import Q
+from pymongo.errors import BulkWriteError, OperationFailure
+from app.benchmark import BENCH_WORDS, bench_text, percentile
+from app.models import (
+    User, Course, Lesson, Enrollment, UserProgress, Counter, Upload, Blob, OutboxEmail,
+    CourseStats, RateLimitBucket,
+)
+
+# `flask lms <command>` - maintenance commands
+lms_cli = AppGroup('lms', help='LearnHub maintenance commands.')
+
+INDEXED_DOCUMENTS = (
+    User, Course, Lesson, Enrollment, UserProgress, Counter, Upload, Blob, OutboxEmail,
+    RateLimitBucket,
+)
+
+
+def hot_queries():
+    # Har route ki main query; explain() ke liye dummy ids kaafi hain
+    some_id = ObjectId()
+    return [
+        ('main.home', Course.objects(is_active=True, is_hidden=False).order_by('-date_posted').limit(6)),
+        ('courses.explore', Course.objects(is_active=True, is_hidden=False)),
+        ('courses.instructor_index', Course.objects(instructor=some_id, is_active=True).order_by('date_created')),
+        ('courses.edit_course', Lesson.objects(course=some_id).order_by('date_created')),
+        ('courses.view_course', Enrollment.objects(student=some_id, course=some_id)),
+        ('courses.complete_lesson', UserProgress.objects(student=some_id, course=some_id)),
+        ('dashboard.student_index', Enrollment.objects(student=some_id)),
+        ('auth.login', User.objects(email='someone@example.com')),
+    ]
+
+
+def _key_of(spec):
+    # Text index server par {_fts: 'text', _ftsx: 1} ban jaata hai, chahe kitne bhi fields ho
+    key = []
+    for field, direction in spec:
+        if direction == 'text':
+            if ('_fts', 'text') not in key:
+                key += [('_fts', 'text'), ('_ftsx', 1)]
+        else:
+            key.append((field, direction))
+    return tuple(key)
+
+
+def _describe_plan(stage):
+    # winningPlan tree ko "LIMIT <- FETCH <- IXSCAN(name)" jaisa flatten karo
+    parts = []
+    while stage:
+        label = stage.get('stage', '?')
+        if stage.get('indexName'):
+            label += f"({stage['indexName']})"
+        parts.append(label)
+        stage = stage.get('inputStage') or (stage.get('inputStages') or [None])[0]
+    return ' <- '.join(parts)
+
+
+@lms_cli.command('indexes')
+@click.option('--dry-run', is_flag=True, help='Only report, do not create missing indexes.')
+def sync_indexes(dry_run):
+    """Create missing indexes, report extra/unused ones and explain hot queries."""
+    for document in INDEXED_DOCUMENTS:
+        collection = document._get_collection()
+        declared = {_key_of(spec['fields']): spec for spec in document._meta['index_specs']}
+        information = collection.index_information()
+        existing = {_key_of(info['key']): name for name, info in information.items() if name != '_id_'}
+
+        click.echo(f"\n[{collection.name}]")
+        missing = set(declared) - set(existing)
+        for key in sorted(missing):
+            click.echo(f"  missing: {key}")
+        # Same keys, alag partial filter (e.g. index partial banaya gaya) - drop karke dobara banao
+        changed = [
+            key for key in set(declared) & set(existing)
+            if declared[key].get('partialFilterExpression') != information[existing[key]].get('partialFilterExpression')
+        ]
+        for key in sorted(changed):
+            click.echo(f"  partial filter changed: {existing[key]}")
+            if not dry_run:
+                collection.drop_index(existing[key])
+        if (missing or changed) and not dry_run:
+            try:
+                document.ensure_indexes()
+                click.echo(f"  created {len(missing) + len(changed)} index(es)")
+            except OperationFailure as e:
+                # Unique index purane duplicate rows ki wajah se fail ho sakta hai
+                click.echo(f"  ERROR creating indexes: {e}")
+
+        for key, name in sorted(existing.items()):
+            if key not in declared:
+                click.echo(f"  extra (not declared in model): {name}")
+
+        try:
+            for stat in collection.aggregate([{'$indexStats': {}}]):
+                if stat['name'] != '_id_' and stat['accesses']['ops'] == 0:
+                    click.echo(f"  unused since {stat['accesses']['since']:%Y-%m-%d}: {stat['name']}")
+        except OperationFailure:
+            click.echo("  ($indexStats not available on this server)")
+
+    click.echo("\nWinning plans:")
+    for endpoint, queryset in hot_queries():
+        plan = queryset.explain()['queryPlanner']['winningPlan']
+        plan = plan.get('queryPlan', plan)  # MongoDB 7+ (SBE) format
+        description = _describe_plan(plan)
+        warning = '  <-- COLLECTION SCAN' if 'COLLSCAN' in description else ''
+        click.echo(f"  {endpoint:<26} {queryset._collection.name:<14} {description}{warning}")
+
+
+@lms_cli.command('recount-lessons')
+def recount_lessons():
+    """Backfill Course.outline and Course.lesson_count from the lessons collection."""
+    total = 0
+    for course_id in Course.objects.scalar('id'):
+        Course.rebuild_outline(course_id)
+        total += 1
+    click.echo(f"Rebuilt outline and lesson_count for {total} course(s).")
+
+
+@lms_cli.command('rebuild-stats')
+def rebuild_stats():
+    """Rebuild the course_stats rollup from enrollments with one $group aggregation."""
+    click.echo(f"Rebuilt stats for {CourseStats.rebuild()} course(s).")
+
+
+@lms_cli.command('cleanup-uploads')
+@click.option('--hours', type=int, default=None, help='Age of abandoned uploads (default: UPLOAD_ABANDON_HOURS).')
+def cleanup_uploads(hours):
+    """Remove abandoned partial chunked uploads."""
+    from app.routes.uploads import cleanup_abandoned_uploads
+    hours = hours or current_app.config['UPLOAD_ABANDON_HOURS']
+    removed = cleanup_abandoned_uploads(datetime.utcnow() - timedelta(hours=hours))
+    click.echo(f"Removed {removed} abandoned upload(s) older than {hours}h.")
+
+
+@lms_cli.command('gc-uploads')
+@click.option('--grace-hours', type=int, default=1, help='Skip blobs/files touched more recently than this.')
+@click.option('--purge-archived', is_flag=True, help='Also free files only used by soft-deleted courses.')
+@click.option('--adopt-legacy', is_flag=True, help='Move timestamp-named files into the content-addressed store first.')
+@click.option('--dry-run', is_flag=True, help='Only report what would be removed.')
+def gc_uploads(grace_hours, purge_archived, adopt_legacy, dry_run):
+    """Recount upload references and delete unreferenced files."""
+    from app.storage import adopt_legacy_files, collect_garbage
+    if adopt_legacy and not dry_run:
+        click.echo(f"Adopted {adopt_legacy_files()} legacy file reference(s).")
+    stats = collect_garbage(grace_hours * 3600, purge_archived=purge_archived, dry_run=dry_run)
+    click.echo(
+        f"Recounted {stats['recounted']} blob(s), removed {stats['blobs_removed']} blob record(s) "
+        f"and {stats['files_removed']} file(s), freed {stats['bytes_freed'] / 1024 ** 2:.1f} MB"
+        + (" (dry run)" if dry_run else "")
+    )
+
+
+@lms_cli.command('archive-courses')
+@click.option('--grace-days', type=int, default=None, help='Only soft-deleted courses older than this (default: ARCHIVE_AFTER_DAYS).')
+@click.option('--batch-size', type=int, default=100, help='Courses moved per batch.')
+@click.option('--dry-run', is_flag=True, help='Only count what would be moved.')
+def archive_courses_command(grace_days, batch_size, dry_run):
+    """Move soft-deleted courses and their lessons/enrollments/progress to *_archive collections."""
+    from app.archive import archive_courses
+    grace_days = current_app.config['ARCHIVE_AFTER_DAYS'] if grace_days is None else grace_days
+    counts = archive_courses(grace_days, batch_size, dry_run=dry_run, echo=click.echo)
+    for name, count in counts.items():
+        click.echo(f"  {name:<22} {count}" + (" (dry run)" if dry_run else ""))
+
+
+@lms_cli.command('restore-course')
+@click.argument('course_id')
+@click.option('--activate', is_flag=True, help='Also make the course active (visible) again.')
+def restore_course_command(course_id, activate):
+    """Move an archived course and its dependent documents back to the hot collections."""
+    from app.archive import restore_course
+    from app.catalog import bump_catalog_version
+    if not ObjectId.is_valid(course_id):
+        raise click.BadParameter(f"{course_id!r} is not a course id.")
+    counts = restore_course(ObjectId(course_id), activate=activate)
+    if counts is None:
+        raise click.ClickException(f"Course {course_id} is not in the archive.")
+    bump_catalog_version()
+    for name, count in counts.items():
+        click.echo(f"  {name:<14} {count}")
+    click.echo("Restored" + (" and activated." if activate else " (still inactive)."))
+
+
+@lms_cli.command('renditions')
+@click.option('--force', is_flag=True, help='Regenerate even if renditions already exist.')
+def generate_renditions(force):
+    """Backfill profile picture / signature renditions for existing users."""
+    from app.images import image_pipeline
+    done = failed = 0
+    for field, folder in (('profile_pic', 'profile_pics'), ('signature_filename', 'signatures')):
+        for filename in User.objects(**{f'{field}__ne': None}).scalar(field):
+            if not filename or (not force and image_pipeline.has_renditions(folder, filename)):
+                continue
+            try:
+                image_pipeline.render_now(folder, filename)
+                done += 1
+            except Exception as e:  # missing/corrupt file: original hi serve hota rahega
+                failed += 1
+                click.echo(f"  {folder}/{filename}: {e}")
+    click.echo(f"Rendered {done} image(s), {failed} failed.")
+
+
+@lms_cli.command('outbox-worker')
+@click.option('--once', is_flag=True, help='Send a single batch and exit (e.g. from cron).')
+def outbox_worker(once):
+    """Send queued emails in batches over one reused SMTP connection."""
+    from app.outbox import run_worker
+    run_worker(once=once, log=click.echo)
+
+
+@lms_cli.command('bench-bcrypt')
+@click.option('--costs', default='10,11,12,13', help='Comma separated bcrypt cost factors.')
+@click.option('--seconds', default=3.0, help='Time budget per cost.')
+def bench_bcrypt(costs, seconds):
+    """Measure password checks (logins) per second per core at each bcrypt cost."""
+    from app import bcrypt
+    current = current_app.config.get('BCRYPT_LOG_ROUNDS')
+    click.echo(f"{'cost':>4} {'ms/check':>9} {'logins/sec/core':>16}")
+    for cost in (int(c) for c in costs.split(',')):
+        hashed = bcrypt.generate_password_hash('benchmark-password', rounds=cost)
+        checks, start = 0, time.perf_counter()
+        # Single thread = ek core; fleet size = peak logins/sec / is number
+        while time.perf_counter() - start < seconds:
+            bcrypt.check_password_hash(hashed, 'benchmark-password')
+            checks += 1
+        elapsed = time.perf_counter() - start
+        marker = '  <- BCRYPT_LOG_ROUNDS' if cost == current else ''
+        click.echo(f"{cost:>4} {elapsed / checks * 1000:>9.1f} {checks / elapsed:>16.1f}{marker}")
+
+
+EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+
+def _hash_password(args):
+    # Process pool worker (top-level taaki pickle ho sake); Flask-Bcrypt jaisa hi $2b$ hash
+    password, rounds = args
+    return bcrypt_lib.hashpw(password.encode('utf-8'), bcrypt_lib.gensalt(rounds)).decode('utf-8')
+
+
+def _read_roster(path, stats):
+    # username,email,password[,role] - invalid rows yahin gin liye jaate hain
+    seen_usernames, seen_emails = set(), set()
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            username = (row.get('username') or '').strip()
+            email = (row.get('email') or '').strip()
+            password = row.get('password') or ''
+            role = (row.get('role') or 'student').strip().lower()
+            if not (2 <= len(username) <= 20) or not EMAIL_RE.match(email) or not password \
+                    or role not in ('student', 'instructor'):
+                stats['invalid'] += 1
+                continue
+            if username in seen_usernames or email in seen_emails:
+                stats['duplicate_in_file'] += 1
+                continue
+            seen_usernames.add(username)
+            seen_emails.add(email)
+            yield {'username': username, 'email': email, 'password': password, 'role': role}
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _insert_many(collection, docs):
+    """insert_many(ordered=False); returns the set of indexes that failed."""
+    if not docs:
+        return set()
+    try:
+        collection.insert_many(docs, ordered=False)
+        return set()
+    except BulkWriteError as e:
+        return {error['index'] for error in e.details['writeErrors']}
+
+
+@lms_cli.command('import-users')
+@click.argument('roster', type=click.Path(exists=True, dir_okay=False))
+@click.option('--batch-size', default=1000, show_default=True)
+@click.option('--workers', default=os.cpu_count(), show_default=True, help='bcrypt hashing processes.')
+@click.option('--course', 'course_id', default=None, help='Also enroll the imported users into this course.')
+def import_users(roster, batch_size, workers, course_id):
+    """Bulk-create users from a CSV roster (username,email,password[,role])."""
+    course = None
+    if course_id:
+        # Import shuru hone se pehle: galat id par aadha import karke crash nahi
+        course = Course.objects(id=course_id).only('id').first() if ObjectId.is_valid(course_id) else None
+        if course is None:
+            raise click.BadParameter(f"no course with id {course_id!r}", param_hint="'--course'")
+    rounds = current_app.config.get('BCRYPT_LOG_ROUNDS', 12)
+    users_collection = User._get_collection()
+    enrollments_collection = Enrollment._get_collection()
+    stats = {key: 0 for key in (
+        'invalid', 'duplicate_in_file', 'existing', 'inserted', 'write_errors', 'enrolled', 'enroll_errors'
+    )}
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for batch in _batches(_read_roster(roster, stats), batch_size):
+            # 1. Existing usernames/emails: poore batch ke liye ek hi $in query
+            existing = User.objects(
+                Q(username__in=[r['username'] for r in batch]) | Q(email__in=[r['email'] for r in batch])
+            ).only('username', 'email')
+            taken_usernames = {u.username for u in existing}
+            taken_emails = {u.email for u in existing}
+            fresh = [r for r in batch if r['username'] not in taken_usernames and r['email'] not in taken_emails]
+            stats['existing'] += len(batch) - len(fresh)
+
+            # 2. bcrypt process pool mein (CPU bound)
+            hashes = pool.map(_hash_password, [(r['password'], rounds) for r in fresh], chunksize=16)
+            docs = []
+            for row, hashed in zip(fresh, hashes):
+                user = User(id=ObjectId(), username=row['username'], email=row['email'],
+                            password=hashed, role=row['role'])
+                user.validate()
+                docs.append(user.to_mongo().to_dict())
+
+            # 3. Unordered bulk insert; race mein bane duplicates sirf apni row fail karte hain
+            failed = _insert_many(users_collection, docs)
+            stats['write_errors'] += len(failed)
+            inserted = [doc for i, doc in enumerate(docs) if i not in failed]
+            stats['inserted'] += len(inserted)
+
+            # 4. Optional cohort enrollment (unique (student, course) index duplicates rokta hai)
+            if course and inserted:
+                enrollments = [
+                    Enrollment(student=doc['_id'], course=course.id).to_mongo().to_dict()
+                    for doc in inserted if doc['role'] == 'student'
+                ]
+                failed = _insert_many(enrollments_collection, enrollments)
+                stats['enrolled'] += len(enrollments) - len(failed)
+                if len(enrollments) > len(failed):
+                    CourseStats.record_enrollment(course.id, count=len(enrollments) - len(failed))
+                stats['enroll_errors'] += len(failed)
+
+            click.echo(f"  ...{stats['inserted']} inserted so far")
+
+    elapsed = time.perf_counter() - start
+    processed = sum(stats[k] for k in ('invalid', 'duplicate_in_file', 'existing', 'inserted', 'write_errors'))
+    click.echo(f"\nProcessed {processed} row(s) in {elapsed:.1f}s ({processed / elapsed if elapsed else 0:.0f} rows/sec)")
+    for key, value in stats.items():
+        click.echo(f"  {key:<18} {value}")
+
+
+@lms_cli.command('certificates')
+@click.option('--course', 'course_id', required=True, help='Course id to pre-generate certificates for.')
+@click.option('--workers', default=os.cpu_count(), show_default=True)
+def generate_certificates(course_id, workers):
+    """Pre-render certificates for every 100%-progress enrollment of a course."""
+    from app.certificates import generate_for_course
+    start = time.perf_counter()
+    count = generate_for_course(course_id, workers=workers)
+    click.echo(f"Generated {count} certificate(s) in {time.perf_counter() - start:.1f}s.")
+
+
+BENCH_TAG = '[bench]'
+BENCH_EMAIL_DOMAIN = 'bench.learnhub.test'
+
+
+def _require_local_database(allow_remote):
+    from app.benchmark import is_local_database
+    if not allow_remote and not is_local_database(current_app):
+        raise click.ClickException("MONGODB_URI is not a local mongod; pass --allow-remote if you really mean it.")
+
+
+def _seed_bench_corpus(rng, course_total, lessons_per_course, description_words=60, hidden=True, instructors=0):
+    # Default: seeded courses hidden rehte hain taaki catalog mein na dikhen.
+    # Search benchmark ko visible chahiye (search sirf public courses dekhta hai) -
+    # isliye woh sirf local DB par chalta hai aur [bench] tag se alag pehchana jaata hai.
+    instructor_ids = [None]
+    if instructors:
+        instructor_ids = User._get_collection().insert_many([
+            User(username=f"bench_{i}", email=f"instructor{i}@{BENCH_EMAIL_DOMAIN}",
+                 password='!', role='instructor').to_mongo().to_dict()
+            for i in range(instructors)
+        ]).inserted_ids
+    course_docs = [
+        Course(title=f"{BENCH_TAG} {bench_text(rng, 4)}", description=bench_text(rng, description_words),
+               is_hidden=hidden, lesson_count=lessons_per_course,
+               instructor=instructor_ids[i % len(instructor_ids)]).to_mongo().to_dict()
+        for i in range(course_total)
+    ]
+    course_ids = Course._get_collection().insert_many(course_docs).inserted_ids
+    lesson_docs = [
+        Lesson(title=f"{BENCH_TAG} {bench_text(rng, 5)}", content=bench_text(rng, 120),
+               course=course_id).to_mongo().to_dict()
+        for course_id in course_ids for _ in range(lessons_per_course)
+    ]
+    for i in range(0, len(lesson_docs), 5000):
+        Lesson._get_collection().insert_many(lesson_docs[i:i + 5000], ordered=False)
+    if not hidden:
+        from app.catalog import bump_catalog_version
+        bump_catalog_version()
+    return course_ids
+
+
+def _drop_bench_corpus(course_ids):
+    Lesson.objects(course__in=course_ids).delete()
+    Course.objects(id__in=course_ids).delete()
+    User._get_collection().delete_many({'email': {'$regex': f'@{BENCH_EMAIL_DOMAIN.replace(".", "[.]")}$'}})
+    from app.catalog import bump_catalog_version
+    bump_catalog_version()
+    click.echo("Removed seeded corpus.")
+
+
+@lms_cli.command('bench-search')
+@click.option('--courses', 'course_total', default=500, show_default=True, help='Synthetic courses to seed.')
+@click.option('--lessons-per-course', default=40, show_default=True)
+@click.option('--queries', default=200, show_default=True)
+@click.option('--keep', is_flag=True, help='Keep the seeded corpus instead of deleting it.')
+@click.option('--allow-remote', is_flag=True, help='Run against a non-local MONGODB_URI.')
+def bench_search(course_total, lessons_per_course, queries, keep, allow_remote):
+    """Seed a synthetic (visible, [bench]-tagged) corpus and measure search latency."""
+    from app.search import search_catalog
+    _require_local_database(allow_remote)
+    rng = random.Random(42)
+    Course.ensure_indexes()
+    Lesson.ensure_indexes()
+
+    course_ids = _seed_bench_corpus(rng, course_total, lessons_per_course, hidden=False, instructors=20)
+    click.echo(f"Seeded {len(course_ids)} courses / {len(course_ids) * lessons_per_course} lessons")
+
+    try:
+        timings = []
+        for _ in range(queries):
+            query = ' '.join(rng.sample(BENCH_WORDS, rng.randint(1, 3)))
+            start = time.perf_counter()
+            search_catalog(query, page=rng.randint(1, 3))
+            timings.append((time.perf_counter() - start) * 1000)
+
+        # Confirm karo ki plan text index use kar raha hai (COLLSCAN nahi)
+        plan = Lesson.objects.search_text('python').explain()['queryPlanner']['winningPlan']
+        click.echo(f"Lesson search plan: {_describe_plan(plan.get('queryPlan', plan))}")
+        click.echo(
+            f"{queries} queries: mean {statistics.mean(timings):.1f} ms, p50 {percentile(timings, 50):.1f} ms, "
+            f"p95 {percentile(timings, 95):.1f} ms, p99 {percentile(timings, 99):.1f} ms"
+        )
+    finally:
+        if not keep:
+            _drop_bench_corpus(course_ids)
+
+
+@lms_cli.command('bench-read-models')
+@click.option('--rows', default='1000,10000', show_default=True, help='Comma separated row counts.')
+@click.option('--allow-remote', is_flag=True, help='Run against a non-local MONGODB_URI.')
+def bench_read_models(rows, allow_remote):
+    """Compare memory and render time of Document lists vs projected read models."""
+    import tracemalloc
+    from flask import g, render_template
+    from app import query_metrics
+    from app.models import prefetch
+    from app.read_models import course_cards
+
+    _require_local_database(allow_remote)
+    if not query_metrics.enabled:
+        raise click.ClickException("QUERY_METRICS_ENABLED must be on to count queries.")
+    sizes = [int(r) for r in rows.split(',')]
+    course_ids = _seed_bench_corpus(random.Random(7), max(sizes), 0, description_words=400, instructors=50)
+    loaders = (
+        ('Document', lambda queryset: prefetch(queryset, 'instructor')),
+        ('read model', course_cards),
+    )
+    try:
+        click.echo(f"{'rows':>6} {'path':<11} {'load+render ms':>15} {'peak MB':>8} {'queries':>8}")
+        with current_app.test_request_context():
+            for size in sizes:
+                for label, load in loaders:
+                    queryset = Course.objects(id__in=course_ids[:size])
+                    query_metrics._start_request()
+                    tracemalloc.start()
+                    start = time.perf_counter()
+                    render_template('partials/explore_grid.html', courses=load(queryset))
+                    elapsed = (time.perf_counter() - start) * 1000
+                    peak = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+                    tracemalloc.stop()
+                    # getMore batches chhod kar: courses ki ek query + instructors ka ek $in, rows kitni bhi hon
+                    queries = sum(n for shape, n in g.query_shapes.items() if not shape.startswith('getMore'))
+                    click.echo(f"{size:>6} {label:<11} {elapsed:>15.1f} {peak:>8.1f} {queries:>8}")
+                    if queries != 2:
+                        raise click.ClickException(f"{label}: expected 2 queries, got {queries} (N+1?)")
+    finally:
+        _drop_bench_corpus(course_ids)
+
+
+@lms_cli.command('seed')
+@click.option('--users', default=100000, show_default=True)
+@click.option('--courses', default=5000, show_default=True)
+@click.option('--lessons-per-course', default=40, show_default=True)
+@click.option('--enrollments', default=1000000, show_default=True)
+@click.option('--batch-size', default=10000, show_default=True)
+@click.option('--seed', 'rng_seed', default=1, show_default=True, help='Random seed (same seed = same data shape).')
+@click.option('--reset', is_flag=True, help='Delete data from previous seed runs first.')
+@click.option('--allow-remote', is_flag=True, help='Allow seeding a non-local MongoDB.')
+def seed(users, courses, lessons_per_course, enrollments, batch_size, rng_seed, reset, allow_remote):
+    """Bulk-load synthetic users, courses, lessons and enrollments."""
+    from app.benchmark import SEED_PASSWORD, remove_seed_data, seed_database
+    from app.catalog import bump_catalog_version
+    _require_local_database(allow_remote)
+    if reset:
+        click.echo(f"Removed {remove_seed_data()} seeded user(s) and their data.")
+
+    start = time.perf_counter()
+    counts = seed_database(users, courses, lessons_per_course, enrollments,
+                           batch_size=batch_size, seed=rng_seed, echo=click.echo)
+    bump_catalog_version()
+    click.echo(f"Seeded {sum(counts.values())} documents in {time.perf_counter() - start:.1f}s "
+               f"(password for every seeded user: {SEED_PASSWORD!r}).")
+    click.echo("Run `flask lms indexes` if the indexes are not in place yet.")
+
+
+@lms_cli.command('bench')
+@click.option('--requests', 'total', default=200, show_default=True, help='Measured requests per scenario.')
+@click.option('--concurrency', default=8, show_default=True, help='Client threads.')
+@click.option('--warmup', default=5, show_default=True, help='Unmeasured requests per thread.')
+@click.option('--scenario', 'scenarios', multiple=True, help='Endpoint to run (repeatable); default all.')
+@click.option('--output', type=click.Path(dir_okay=False), help='Write results as JSON (e.g. a new baseline).')
+@click.option('--baseline', type=click.Path(exists=True, dir_okay=False), help='Compare against a previous JSON run.')
+@click.option('--tolerance', default=0.2, show_default=True, help='Allowed p95 slowdown vs baseline (0.2 = 20%).')
+@click.option('--allow-remote', is_flag=True, help='Allow benchmarking against a non-local MongoDB.')
+def bench(total, concurrency, warmup, scenarios, output, baseline, tolerance, allow_remote):
+    """Drive the main routes through the test client and record p50/p95/p99 + queries/request."""
+    from app.benchmark import SCENARIOS, RouteBenchmark, compare_runs
+    _require_local_database(allow_remote)
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise click.BadParameter(f"unknown scenario(s): {', '.join(sorted(unknown))}", param_hint='--scenario')
+
+    try:
+        runner = RouteBenchmark(current_app._get_current_object(), concurrency=concurrency, warmup=warmup)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    result = runner.run(scenarios or SCENARIOS, total, echo=click.echo)
+
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, sort_keys=True)
+        click.echo(f"Wrote {output}")
+    if baseline:
+        with open(baseline, encoding='utf-8') as f:
+            regressions = compare_runs(json.load(f), result, tolerance)
+        for line in regressions:
+            click.echo(f"REGRESSION {line}", err=True)
+        if regressions:
+            raise SystemExit(1)
+        click.echo(f"No regressions against {baseline}.")
+
+
+@lms_cli.command('bench-enroll')
+@click.option('--students', default=20, show_default=True)
+@click.option('--parallel', default=16, show_default=True, help='Concurrent requests.')
+@click.option('--repeats', default=4, show_default=True, help='Duplicate POSTs per student and endpoint.')
+@click.option('--allow-remote', is_flag=True, help='Allow running against a non-local MongoDB.')
+def bench_enroll(students, parallel, repeats, allow_remote):
+    """Hammer enroll + payment in parallel and verify there are no duplicate enrollments."""
+    from app.benchmark import hammer_enrollment
+    _require_local_database(allow_remote)
+    try:
+        sent, problems = hammer_enrollment(current_app._get_current_object(), students, parallel, repeats)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    for problem in problems:
+        click.echo(f"FAIL {problem}", err=True)
+    if problems:
+        raise SystemExit(1)
+    click.echo(f"OK: {sent} parallel POSTs, one enrollment per (student, course), stats consistent.")
+
+
+@lms_cli.command('bench-startup')
+@click.option('--runs', default=3, show_default=True, help='Fresh processes per mode.')
+def bench_startup(runs):
+    """Measure cold start and first-request latency with and without warm-up."""
+    from app.warmup import measure_in_subprocess
+    project_root = os.path.dirname(current_app.root_path)
+    for warm in (False, True):
+        results = [measure_in_subprocess(warm, cwd=project_root) for _ in range(runs)]
+        click.echo(f"\n{'with' if warm else 'without'} warm-up ({runs} run(s), median):")
+        for key in ('create_app_ms', 'first_request_ms', 'second_request_ms'):
+            click.echo(f"  {key:<18} {statistics.median(r[key] for r in results):>8.1f}")
+        if warm:
+            for step in results[0]['warm_up_ms']:
+                click.echo(f"  warm-up {step:<10} {statistics.median(r['warm_up_ms'][step] for r in results):>8.1f}")
@@ -0,0 +1,197 @@
+import logging
+import multiprocessing
+import os
+import posixpath
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from flask import abort, request, url_for
+from app.cache import TTLCache
+
+# Profile pictures aur signatures ke fixed renditions. Original upload blob store
+# mein waisa hi rehta hai (EXIF/GPS ke saath), isliye woh kabhi serve nahi hota:
+# static route uploads/<folder>/<original> par 404 deta hai, sirf renditions
+# (static/uploads/<folder>/renditions/<blob stem>-<name>.<ext>) public hain.
+# Naam deterministic hai (content-addressed source), DB mein kuch save nahi hota.
+# Photos ka JPEG hamesha banta hai (har browser); WebP bhi, agar Pillow support kare -
+# templates <picture> se dono dete hain, browser khud chunta hai.
+
+log = logging.getLogger(__name__)
+
+RENDITION_DIR = 'renditions'
+
+# folder -> {rendition: (width, height, mode)}; cover = crop to exact size, fit = max box
+RENDITIONS = {
+    'profile_pics': {'thumb': (96, 96, 'cover'), 'medium': (320, 320, 'cover')},
+    'signatures': {'signature': (600, 200, 'fit')},
+}
+# Signatures transparent PNG hi rehte hain (certificate ke background par)
+TRANSPARENT_FOLDERS = {'signatures'}
+SIGNATURE_WHITE_LEVEL = 230  # isse halke pixels (kagaz) transparent ho jaate hain
+
+
+def _webp_supported():
+    try:
+        from PIL import features
+        return features.check('webp')
+    except ImportError:
+        return False
+
+
+def rendition_formats(folder, webp):
+    """Extensions written for `folder`; the first one is the universal fallback."""
+    if folder in TRANSPARENT_FOLDERS:
+        return ('png',)
+    return ('jpg', 'webp') if webp else ('jpg',)
+
+
+def rendition_name(folder, filename, rendition, extension):
+    stem = os.path.splitext(filename)[0]
+    return f"{stem}-{rendition}.{extension}"
+
+
+def render_renditions(source_path, out_dir, folder, filename, webp, quality):
+    """Process pool worker: decode once, write every rendition for `folder`. Returns names written."""
+    from PIL import Image, ImageOps
+
+    with Image.open(source_path) as original:
+        original.load()
+        # Phone photos: EXIF orientation apply karo, phir saara metadata chhod do
+        image = ImageOps.exif_transpose(original)
+    image.info = {}
+
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+    for rendition, (width, height, mode) in RENDITIONS[folder].items():
+        if folder in TRANSPARENT_FOLDERS:
+            out = image.convert('RGBA')
+            luminance = out.convert('L').point(lambda v: 0 if v >= SIGNATURE_WHITE_LEVEL else 255)
+            alpha = Image.composite(out.getchannel('A'), luminance, luminance)
+            out.putalpha(alpha)
+        else:
+            out = image.convert('RGB')
+        if mode == 'cover':
+            out = ImageOps.fit(out, (width, height), Image.LANCZOS)
+        else:
+            out.thumbnail((width, height), Image.LANCZOS)
+
+        for extension in rendition_formats(folder, webp):
+            name = rendition_name(folder, filename, rendition, extension)
+            target = os.path.join(out_dir, name)
+            tmp_path = f"{target}.tmp-{uuid.uuid4().hex}"
+            if extension == 'png':
+                out.save(tmp_path, 'PNG', optimize=True)
+            elif extension == 'webp':
+                out.save(tmp_path, 'WEBP', quality=quality, method=4)
+            else:
+                out.save(tmp_path, 'JPEG', quality=quality, optimize=True, progressive=True)
+            os.replace(tmp_path, target)
+            written.append(name)
+    return written
+
+
+class ImagePipeline:
+    """Background rendition generation + `image_url()` template global."""
+
+    def __init__(self):
+        self.app = None
+        self.static_folder = None
+        self.workers = 2
+        self.quality = 80
+        self.webp = False
+        self._executor = None
+        self._ready = TTLCache(maxsize=4096, ttl=3600)  # sirf "rendition ban chuka hai" cache hota hai
+        self._failed = TTLCache(maxsize=1024, ttl=300)  # corrupt / Pillow missing: har request par retry nahi
+
+    def init_app(self, app):
+        self.app = app
+        self.static_folder = app.static_folder
+        self.workers = app.config.get('IMAGE_WORKERS', self.workers)
+        self.quality = app.config.get('IMAGE_QUALITY', self.quality)
+        self.webp = _webp_supported()
+        app.add_template_global(self.image_url)
+        app.before_request(self._block_originals)
+
+    def _block_originals(self):
+        # uploads/<folder>/<original> = EXIF/GPS wali asli file; sirf renditions/ public
+        if request.endpoint == 'static':
+            parts = posixpath.normpath(request.view_args.get('filename', '')).split('/')
+            if len(parts) == 3 and parts[0] == 'uploads' and parts[1] in RENDITIONS:
+                abort(404)
+
+    def _source_path(self, folder, filename):
+        return os.path.join(self.static_folder, 'uploads', folder, filename)
+
+    def _out_dir(self, folder):
+        return os.path.join(self.static_folder, 'uploads', folder, RENDITION_DIR)
+
+    def _pool(self):
+        if self._executor is None:
+            # spawn: threaded web worker ko fork karna safe nahi hai
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._executor
+
+    def submit(self, folder, filename, on_ready=None):
+        """Queue rendition generation; returns immediately (None if there is nothing to do).
+
+        `on_ready` app context ke andar chalta hai jab renditions likh di jaayein,
+        e.g. cached catalog fragments / certificates ko invalidate karne ke liye.
+        """
+        if not filename or folder not in RENDITIONS:
+            return None
+        future = self._pool().submit(
+            render_renditions, self._source_path(folder, filename), self._out_dir(folder),
+            folder, filename, self.webp, self.quality
+        )
+        future.add_done_callback(lambda f: self._done(f, folder, filename, on_ready))
+        return future
+
+    def _done(self, future, folder, filename, on_ready):
+        if future.exception() is not None:
+            # Decode fail (corrupt/non-image upload) = image_url '' deta hai, templates placeholder dikhate hain
+            log.warning("Rendition failed for %s/%s: %s", folder, filename, future.exception())
+            return
+        if on_ready is not None:
+            with self.app.app_context():
+                on_ready()
+
+    def render_now(self, folder, filename):
+        # CLI backfill (`flask lms renditions`) aur image_url ka fallback
+        return render_renditions(self._source_path(folder, filename), self._out_dir(folder),
+                                 folder, filename, self.webp, self.quality)
+
+    def has_renditions(self, folder, filename):
+        return all(
+            os.path.exists(os.path.join(self._out_dir(folder), rendition_name(folder, filename, r, extension)))
+            for r in RENDITIONS[folder] for extension in rendition_formats(folder, self.webp)
+        )
+
+    def image_url(self, folder, filename, rendition, extension=None):
+        """URL of `rendition` (default: universal JPEG/PNG; or 'webp'), '' if it can't be produced.
+
+        Original upload kabhi nahi - usmein metadata hai. Background job abhi
+        chal raha ho (ya purani upload ho) toh rendition yahin ek baar ban jaata hai.
+        """
+        formats = rendition_formats(folder, self.webp)
+        extension = extension or formats[0]
+        if not filename or extension not in formats:
+            return ''
+        key = (folder, filename, rendition, extension)
+        name = self._ready.get(key)
+        if name is None:
+            name = rendition_name(folder, filename, rendition, extension)
+            if not os.path.exists(os.path.join(self._out_dir(folder), name)):
+                if self._failed.get((folder, filename)):
+                    return ''
+                try:
+                    self.render_now(folder, filename)
+                except Exception as e:
+                    log.warning("Rendition failed for %s/%s: %s", folder, filename, e)
+                    self._failed.set((folder, filename), True)
+                    return ''
+            self._ready.set(key, name)
+        return url_for('static', filename=f'uploads/{folder}/{RENDITION_DIR}/{name}')
+
+
+image_pipeline = ImagePipeline()
@@ -0,0 +1,161 @@
+import bisect
+import logging
+import threading
+from collections import Counter, defaultdict
+from flask import g, has_request_context, request
+from pymongo import monitoring
+
+# Har MongoDB command ko (duration + collection ke saath) current Flask endpoint
+# se jodta hai. Ek request mein same query shape N se zyada baar chale toh woh
+# N+1 maana jaata hai (e.g. template loop mein course.instructor dereference).
+# Histograms per-process hain; /metrics har worker apna hi data dikhata hai.
+
+log = logging.getLogger('app.queries')
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+# Ye commands query shape nahi, connection housekeeping hain
+IGNORED_COMMANDS = {'hello', 'ismaster', 'isMaster', 'ping', 'endSessions', 'saslStart',
+                    'saslContinue', 'buildInfo', 'getLastError'}
+SHAPE_KEYS = ('filter', 'query', 'q', 'pipeline', 'sort', 'projection', 'updates', 'deletes')
+
+
+class Histogram:
+    """Prometheus-style cumulative histogram keyed by a label tuple."""
+
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = defaultdict(lambda: [[0] * (len(buckets) + 1), 0.0])
+
+    def observe(self, labels, value):
+        series = self._series[labels]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(self._series.items()):
+            base = ','.join(f'{k}="{v}"' for k, v in zip(self.label_names, labels))
+            running = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                running += count
+                lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {running}')
+            lines.append(f'{self.name}_sum{{{base}}} {total:.6f}')
+            lines.append(f'{self.name}_count{{{base}}} {running}')
+        return lines
+
+
+def query_shape(value):
+    """Replace literal values with '?' so `{_id: 1}` and `{_id: 2}` look the same."""
+    if isinstance(value, dict):
+        return {k: query_shape(v) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        # Pipeline stages shape ka hissa hain; $in ki values (aur unki ginti) nahi
+        if value and all(isinstance(v, dict) for v in value):
+            return [query_shape(v) for v in value]
+        return ['?']
+    return '?'
+
+
+class QueryMetrics(monitoring.CommandListener):
+    """pymongo CommandListener + Flask hooks for per-endpoint query metrics."""
+
+    def __init__(self):
+        self.slow_query_ms = 0
+        self.n_plus_one_threshold = 10
+        self.enabled = True
+        self._registered = False
+        self._lock = threading.Lock()
+        self._pending = {}
+        self.query_duration = Histogram(
+            'lms_mongo_query_duration_seconds', 'MongoDB command latency.',
+            ('endpoint', 'collection', 'command'), DURATION_BUCKETS)
+        self.queries_per_request = Histogram(
+            'lms_mongo_queries_per_request', 'MongoDB commands issued per request.',
+            ('endpoint',), COUNT_BUCKETS)
+        self.n_plus_one = Counter()
+
+    def init_app(self, app):
+        # Listener MongoClient banne se PEHLE register hona chahiye (db.init_app se pehle)
+        self.enabled = app.config.get('QUERY_METRICS_ENABLED', True)
+        self.slow_query_ms = app.config.get('SLOW_QUERY_MS', 0)
+        self.n_plus_one_threshold = app.config.get('N_PLUS_ONE_THRESHOLD', 10)
+        if not self.enabled:
+            return
+        if not self._registered:
+            monitoring.register(self)
+            self._registered = True
+        app.before_request(self._start_request)
+        app.teardown_request(self._finish_request)
+
+    # --- Flask hooks ---
+
+    def _start_request(self):
+        g.query_count = 0
+        g.query_shapes = Counter()
+
+    def _finish_request(self, exc=None):
+        if 'query_shapes' not in g:
+            return
+        endpoint = request.endpoint or 'unmatched'
+        repeated = [(shape, n) for shape, n in g.query_shapes.items() if n > self.n_plus_one_threshold]
+        with self._lock:
+            self.queries_per_request.observe((endpoint,), g.query_count)
+            if repeated:
+                self.n_plus_one[endpoint] += 1
+        for shape, n in repeated:
+            log.warning("N+1 on %s: %s ran %d times in one request", endpoint, shape, n)
+
+    # --- pymongo CommandListener ---
+
+    def started(self, event):
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = event.command.get('collection', '')  # getMore
+        endpoint = shape = None
+        if has_request_context() and 'query_shapes' in g:
+            endpoint = request.endpoint or 'unmatched'
+            body = {k: query_shape(event.command[k]) for k in SHAPE_KEYS if k in event.command}
+            shape = f"{event.command_name} {collection} {body}"
+            g.query_count += 1
+            g.query_shapes[shape] += 1
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (endpoint, collection, shape)
+
+    def succeeded(self, event):
+        self._finish(event, 'ok')
+
+    def failed(self, event):
+        self._finish(event, 'failed')
+
+    def _finish(self, event, outcome):
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+            if pending is None:
+                return
+            endpoint, collection, shape = pending
+            seconds = event.duration_micros / 1e6
+            if endpoint is not None:
+                self.query_duration.observe((endpoint, collection, event.command_name), seconds)
+        if self.slow_query_ms and seconds * 1000 >= self.slow_query_ms:
+            log.warning("Slow query (%.1f ms, %s): %s", seconds * 1000, outcome,
+                        shape or f"{event.command_name} {collection}")
+
+    # --- Exposition ---
+
+    def render(self, extra_gauges=()):
+        with self._lock:
+            lines = self.query_duration.render() + self.queries_per_request.render()
+            lines += ['# HELP lms_n_plus_one_requests_total Requests with a repeated query shape.',
+                      '# TYPE lms_n_plus_one_requests_total counter']
+            lines += [f'lms_n_plus_one_requests_total{{endpoint="{ep}"}} {n}'
+                      for ep, n in sorted(self.n_plus_one.items())]
+        for name, help_text, value in extra_gauges:
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge', f'{name} {value}']
+        return '\n'.join(lines) + '\n'
@@ -1,5 +1,10 @@
+import hashlib
+import hmac
 from datetime import datetime
-from app import db, login_manager
+from bson import DBRef, ObjectId
+from mongoengine.errors import NotUniqueError
+from pymongo import ReturnDocument
+from app import db, login_manager, user_cache
 from flask_login import UserMixin
 from itsdangerous import URLSafeTimedSerializer as Serializer
 from flask import current_app
@@ -11,7 +16,14 @@ from flask import current_app
 @login_manager.user_loader
 def load_user(user_id):
     # MongoDB uses ObjectId (stored as string in Flask-Login)
-    return User.objects(id=user_id).first()
+    # Raw document cache hota hai; har request ko apna fresh User object milta hai
+    son = user_cache.get(user_id)
+    if son is None:
+        son = User.objects(id=user_id).as_pymongo().first()
+        if son is None:
+            return None
+        user_cache.set(user_id, son)
+    return User._from_son(son)
 
 
 # =======================
@@ -43,6 +55,21 @@ class User(db.Document, UserMixin):
 
     def __repr__(self):
         return f"User('{self.username}', '{self.email}')"
+
+    # Write-through invalidation: user badla toh cached copy hata do
+    def update(self, **kwargs):
+        result = super().update(**kwargs)
+        user_cache.invalidate(str(self.id))
+        return result
+
+    def save(self, *args, **kwargs):
+        result = super().save(*args, **kwargs)
+        user_cache.invalidate(str(self.id))
+        return result
+
+    def delete(self, *args, **kwargs):
+        user_cache.invalidate(str(self.id))
+        return super().delete(*args, **kwargs)
     
     def get_reset_token(self):
         s = Serializer(current_app.config['SECRET_KEY'])
@@ -62,12 +89,48 @@ class UserProgress(db.Document):
     student = db.ReferenceField('User', required=True)
     course = db.ReferenceField('Course', required=True)
     completed_lessons = db.ListField(db.ReferenceField('Lesson')) # Finished lessons ki ID list
+    # Video resume: {lesson_id (str): seconds}; app/positions.py batch mein likhta hai
+    positions = db.DictField()
     last_updated = db.DateTimeField(default=datetime.utcnow)
 
+    @classmethod
+    def mark_completed(cls, student_id, course_id, lesson_id):
+        """Atomic $addToSet upsert; returns the new completed-lesson count."""
+        doc = cls._get_collection().find_one_and_update(
+            {"student": student_id, "course": course_id},
+            {
+                "$addToSet": {"completed_lessons": lesson_id},
+                "$set": {"last_updated": datetime.utcnow()},
+            },
+            projection={"completed_lessons": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return len(doc["completed_lessons"])
+
+    meta = {
+        "collection": "user_progress",
+        # Indexes `flask lms indexes` se sync hote hain (see app/cli.py)
+        "auto_create_index": False,
+        "indexes": [
+            {"fields": ("student", "course"), "unique": True},
+        ]
+    }
+
 
 # =======================
 # 2. COURSE DOCUMENT
 # =======================
+class LessonOutline(db.EmbeddedDocument):
+    # Course.outline ki ek entry: sidebar/dashboard ke liye bas itna kaafi hai,
+    # poora Lesson (content, filenames) sirf play karte waqt load hota hai
+    lesson_id = db.ObjectIdField(required=True)
+    title = db.StringField(max_length=100)
+    position = db.IntField()  # 1-based, date_created order
+    has_video = db.BooleanField(default=False)
+    has_resource = db.BooleanField(default=False)
+
+
 class Course(db.Document):
     title = db.StringField(max_length=100, required=True)
     description = db.StringField(required=True)
@@ -82,17 +145,95 @@ class Course(db.Document):
     resource_filename = db.StringField() 
     
     is_active = db.BooleanField(default=True)
+    deactivated_at = db.DateTimeField()  # soft delete ka time; grace period ke baad archive (app/archive.py)
     date_created = db.DateTimeField(default=datetime.utcnow)
     certificate_enabled = db.BooleanField(default=False)
     price = db.IntField(default=0)
+    # Denormalized: lesson create/delete par $inc hota hai, count() query ki zaroorat nahi
+    lesson_count = db.IntField(default=0)
+    # Ordered lesson outline; har lesson write par update (see add_to_outline etc.)
+    outline = db.EmbeddedDocumentListField(LessonOutline)
 
     meta = {
-        "collection": "courses"
+        "collection": "courses",
+        "auto_create_index": False,
+        "indexes": [
+            # Partial: sirf active courses index hote hain (har query is_active=True filter karti hai),
+            # soft-deleted courses index ka size nahi badhate (aur baad mein archive ho jaate hain, app/archive.py)
+            {   # home / explore (keyset)
+                "fields": ["is_active", "is_hidden", "-date_posted", "-id"],
+                "partialFilterExpression": {"is_active": True},
+            },
+            {   # instructor dashboard (keyset)
+                "fields": ["instructor", "is_active", "date_created", "id"],
+                "partialFilterExpression": {"is_active": True},
+            },
+            {   # full-text search (app/search.py)
+                "fields": ["$title", "$description"],
+                "default_language": "english",
+                "weights": {"title": 10, "description": 2},
+                "partialFilterExpression": {"is_active": True},
+            },
+        ]
     }
 
     def __repr__(self):
         return f"Course('{self.title}')"
 
+    def progress_percent(self, completed):
+        if not self.lesson_count:
+            return 0
+        return min(100, int((completed / self.lesson_count) * 100))
+
+    @staticmethod
+    def _outline_entry(lesson, position=None):
+        return {
+            "lesson_id": lesson.id,
+            "title": lesson.title,
+            "position": position,
+            "has_video": bool(lesson.video_filename),
+            "has_resource": bool(lesson.resource_filename),
+        }
+
+    @classmethod
+    def add_to_outline(cls, course_id, lesson):
+        """Append a new lesson to the outline and bump lesson_count in one atomic update."""
+        current = {"$ifNull": ["$outline", []]}
+        entry = dict(cls._outline_entry(lesson), position={"$add": [{"$size": current}, 1]})
+        # Pipeline update: position = array ki lambai + 1, bina pehle padhe
+        cls._get_collection().update_one({"_id": course_id}, [{"$set": {
+            "outline": {"$concatArrays": [current, [entry]]},
+            "lesson_count": {"$add": [{"$ifNull": ["$lesson_count", 0]}, 1]},
+        }}])
+
+    @classmethod
+    def update_outline(cls, course_id, lesson):
+        entry = cls._outline_entry(lesson)
+        cls._get_collection().update_one(
+            {"_id": course_id, "outline.lesson_id": lesson.id},
+            {"$set": {f"outline.$.{key}": entry[key] for key in ("title", "has_video", "has_resource")}}
+        )
+
+    def ensure_outline(self):
+        """Lazily build outline + lesson_count for courses created before they existed."""
+        # Purane courses mein lesson_count 0 / outline khaali hai, jab tak rebuild na ho
+        if self.lesson_count or Lesson.objects(course=self.id).only("id").first() is None:
+            return
+        self.rebuild_outline(self.id)
+        self.reload("outline", "lesson_count")
+
+    @classmethod
+    def rebuild_outline(cls, course_id):
+        """Recompute outline + lesson_count from the lessons collection; returns the count."""
+        lessons = Lesson.objects(course=course_id).only(
+            "title", "video_filename", "resource_filename"
+        ).order_by("date_created", "id")
+        outline = [cls._outline_entry(lesson, position) for position, lesson in enumerate(lessons, 1)]
+        cls._get_collection().update_one(
+            {"_id": course_id}, {"$set": {"outline": outline, "lesson_count": len(outline)}}
+        )
+        return len(outline)
+
 
 # =======================
 # 3. LESSON DOCUMENT
@@ -109,7 +250,16 @@ class Lesson(db.Document):
     date_created = db.DateTimeField(default=datetime.utcnow)
 
     meta = {
-        "collection": "lessons"
+        "collection": "lessons",
+        "auto_create_index": False,
+        "indexes": [
+            ("course", "date_created"),
+            {
+                "fields": ["$title", "$content"],
+                "default_language": "english",
+                "weights": {"title": 5, "content": 1},
+            },
+        ]
     }
 
     def __repr__(self):
@@ -132,8 +282,279 @@ class Enrollment(db.Document):
     payment_status = db.StringField(default='completed') # pending/completed
 
     meta = {
-        "collection": "enrollments"
+        "collection": "enrollments",
+        "auto_create_index": False,
+        "indexes": [
+            {"fields": ("student", "course"), "unique": True},  # ek student, ek course, ek enrollment
+            "course",
+            {   # ek payment transaction = ek enrollment (free enrollments ka transaction_id nahi hota)
+                "fields": ["transaction_id"],
+                "unique": True,
+                "partialFilterExpression": {"transaction_id": {"$type": "string"}},
+            },
+        ]
     }
 
     def __repr__(self):
         return f"Enrollment(Student={self.student.username}, Course={self.course.title})"
+
+    @staticmethod
+    def transaction_key(student_id, course_id):
+        """Idempotency key for a (student, course) purchase: retries/double-clicks get the same id."""
+        digest = hmac.new(current_app.config['SECRET_KEY'].encode(), f"{student_id}:{course_id}".encode(),
+                          hashlib.sha256).hexdigest()
+        return f"PAY_{digest[:24]}"
+
+    @classmethod
+    def enroll(cls, student_id, course_id, amount_paid=0, transaction_id=None):
+        """Atomic upsert on the unique (student, course) key.
+
+        Returns True only for the call that actually created the enrollment;
+        sirf usi par CourseStats badhta hai, isliye parallel requests double count nahi karti.
+        """
+        try:
+            previous = cls.objects(student=student_id, course=course_id).modify(
+                upsert=True, new=False,
+                set_on_insert__date_enrolled=datetime.utcnow(),
+                set_on_insert__progress=0,
+                set_on_insert__amount_paid=amount_paid,
+                set_on_insert__transaction_id=transaction_id,
+                set_on_insert__payment_status="completed",
+            )
+        except NotUniqueError:
+            # Do parallel upserts mein dusra jeet gaya - enrollment already hai
+            return False
+        if previous is not None:
+            return False
+        CourseStats.record_enrollment(course_id, amount_paid)
+        return True
+
+
+# =======================
+# 5. COUNTER DOCUMENT
+# =======================
+class Counter(db.Document):
+    # Named counters, e.g. "catalog_version" (catalog cache invalidation ke liye)
+    name = db.StringField(required=True, unique=True)
+    value = db.IntField(default=0)
+
+    meta = {
+        "collection": "counters"
+    }
+
+    @classmethod
+    def increment(cls, name):
+        doc = cls.objects(name=name).modify(upsert=True, new=True, inc__value=1)
+        return doc.value
+
+    @classmethod
+    def current(cls, name):
+        doc = cls.objects(name=name).only("value").first()
+        return doc.value if doc else 0
+
+
+# =======================
+# 6. CHUNKED UPLOAD DOCUMENT
+# =======================
+class Upload(db.Document):
+    # Resumable (tus-style) upload ka state; file finalize tak instance/ folder mein rehti hai
+    owner = db.ReferenceField(User, required=True)
+    folder = db.StringField(required=True, choices=("videos", "resources"))
+    filename = db.StringField(required=True)
+    length = db.IntField(required=True)     # total bytes
+    offset = db.IntField(default=0)         # bytes received so far
+    sha256 = db.StringField()               # finalize par set hota hai
+    status = db.StringField(default="pending")  # pending/complete
+    # PATCH likhne se pehle offset claim karta hai (lease); do parallel PATCH ek saath nahi likhte
+    lease = db.StringField()
+    locked_until = db.DateTimeField()
+    date_created = db.DateTimeField(default=datetime.utcnow)
+    last_updated = db.DateTimeField(default=datetime.utcnow)
+
+    meta = {
+        "collection": "uploads",
+        "auto_create_index": False,
+        "indexes": [
+            ("status", "last_updated"),  # abandoned uploads cleanup
+        ]
+    }
+
+    def __repr__(self):
+        return f"Upload('{self.filename}', {self.offset}/{self.length})"
+
+
+# =======================
+# 7. BLOB DOCUMENT (content-addressed uploads)
+# =======================
+class Blob(db.Document):
+    # static/uploads/<folder>/<sha256><ext>; ek hi content disk par sirf ek baar
+    folder = db.StringField(required=True)
+    filename = db.StringField(required=True)
+    sha256 = db.StringField(required=True)
+    size = db.IntField(default=0)
+    ref_count = db.IntField(default=0)  # kitne documents is file ko use kar rahe hain
+    date_created = db.DateTimeField(default=datetime.utcnow)
+    last_updated = db.DateTimeField(default=datetime.utcnow)
+
+    meta = {
+        "collection": "blobs",
+        "auto_create_index": False,
+        "indexes": [
+            {"fields": ("folder", "filename"), "unique": True},
+            ("ref_count", "last_updated"),  # gc-uploads
+        ]
+    }
+
+    def __repr__(self):
+        return f"Blob('{self.folder}/{self.filename}', refs={self.ref_count})"
+
+
+# =======================
+# 8. EMAIL OUTBOX DOCUMENT
+# =======================
+class OutboxEmail(db.Document):
+    # Request sirf yahan insert karti hai; `flask lms outbox-worker` SMTP par bhejta hai
+    subject = db.StringField(required=True)
+    sender = db.ListField(db.StringField())  # (name, email) ya [email]
+    recipients = db.ListField(db.StringField(), required=True)
+    body = db.StringField()
+    status = db.StringField(default="pending")  # pending/sending/sent/failed
+    attempts = db.IntField(default=0)
+    last_error = db.StringField()
+    next_attempt_at = db.DateTimeField(default=datetime.utcnow)
+    locked_until = db.DateTimeField()
+    date_created = db.DateTimeField(default=datetime.utcnow)
+    sent_at = db.DateTimeField()
+
+    meta = {
+        "collection": "email_outbox",
+        "auto_create_index": False,
+        "indexes": [
+            ("status", "next_attempt_at"),
+            # Bheje gaye emails 7 din baad apne aap hat jaate hain (TTL)
+            {"fields": ["sent_at"], "expireAfterSeconds": 7 * 24 * 3600},
+        ]
+    }
+
+    def __repr__(self):
+        return f"OutboxEmail('{self.subject}', {self.recipients}, {self.status})"
+
+
+# =======================
+# 9. COURSE STATS ROLLUP
+# =======================
+class CourseStats(db.Document):
+    # Per-course instructor numbers; enroll/payment/progress par $inc se update.
+    # Poora rebuild: `flask lms rebuild-stats` (ek $group aggregation)
+    course_id = db.ObjectIdField(primary_key=True)
+    enrollment_count = db.IntField(default=0)
+    revenue = db.IntField(default=0)
+    progress_sum = db.IntField(default=0)      # average = progress_sum / enrollment_count
+    completion_count = db.IntField(default=0)
+    last_updated = db.DateTimeField(default=datetime.utcnow)
+
+    meta = {
+        "collection": "course_stats"
+    }
+
+    @property
+    def average_progress(self):
+        return round(self.progress_sum / self.enrollment_count) if self.enrollment_count else 0
+
+    @classmethod
+    def record_enrollment(cls, course_id, amount_paid=0, count=1):
+        cls.objects(course_id=course_id).update_one(
+            upsert=True, inc__enrollment_count=count, inc__revenue=amount_paid * count,
+            set__last_updated=datetime.utcnow()
+        )
+
+    @classmethod
+    def record_progress(cls, course_id, old_percent, new_percent):
+        if new_percent == old_percent:
+            return
+        completed = int(new_percent >= 100) - int(old_percent >= 100)
+        cls.objects(course_id=course_id).update_one(
+            upsert=True, inc__progress_sum=new_percent - old_percent,
+            inc__completion_count=completed, set__last_updated=datetime.utcnow()
+        )
+
+    @classmethod
+    def rebuild(cls):
+        # Enrollments se poora collection dobara ($out existing collection ko atomically replace karta hai)
+        list(Enrollment.objects.aggregate([
+            {"$match": {"course": {"$ne": None}}},
+            {"$group": {
+                "_id": "$course",
+                "enrollment_count": {"$sum": 1},
+                "revenue": {"$sum": "$amount_paid"},
+                "progress_sum": {"$sum": "$progress"},
+                "completion_count": {"$sum": {"$cond": [{"$gte": ["$progress", 100]}, 1, 0]}},
+            }},
+            {"$addFields": {"last_updated": "$$NOW"}},
+            {"$out": cls._get_collection_name()},
+        ]))
+        return cls.objects.count()
+
+
+# =======================
+# 10. RATE LIMIT BUCKET (shared store)
+# =======================
+class RateLimitBucket(db.Document):
+    # Sirf RATELIMIT_STORAGE = 'mongo' par use hota hai (app/ratelimit.py)
+    id = db.StringField(primary_key=True)  # "<rule>:<scope>:<key>"
+    tokens = db.FloatField()
+    allowed = db.BooleanField()
+    updated = db.DateTimeField()
+    expires_at = db.DateTimeField()  # bucket bhar jaane ka waqt; uske baad TTL hata deta hai
+
+    meta = {
+        "collection": "rate_limits",
+        "auto_create_index": False,
+        "indexes": [
+            {"fields": ["expires_at"], "expireAfterSeconds": 0},
+        ]
+    }
+
+
+# =======================
+# 11. REFERENCE PREFETCH
+# =======================
+def prefetch(documents, *paths):
+    """Resolve reference fields for a whole list of documents in one go.
+
+    Har path (e.g. "instructor" ya "course.instructor") ke liye sirf ek
+    `$in` query chalti hai, taaki templates mein `course.instructor.username`
+    har row ke liye alag round trip na kare. Returns a plain list.
+    """
+    documents = list(documents)
+    for path in paths:
+        targets = documents
+        for field_name in path.split('.'):
+            _resolve_reference(targets, field_name)
+            targets = [
+                doc._data.get(field_name) for doc in targets
+                if isinstance(doc._data.get(field_name), db.Document)
+            ]
+    return documents
+
+
+def _resolve_reference(documents, field_name):
+    # DBRef/ObjectId abhi resolve nahi hue hain -> unko id ke hisaab se group karo
+    pending = {}
+    for doc in documents:
+        value = doc._data.get(field_name)
+        if isinstance(value, DBRef):
+            value = value.id
+        if isinstance(value, ObjectId):
+            pending.setdefault(value, []).append(doc)
+
+    if not pending:
+        return
+
+    document_type = documents[0]._fields[field_name].document_type
+    found = {obj.id: obj for obj in document_type.objects(id__in=list(pending))}
+
+    # Cached object seedha _data mein rakh do, dobara dereference nahi hoga
+    for obj_id, owners in pending.items():
+        for doc in owners:
+            doc._data[field_name] = found.get(obj_id)
@@ -0,0 +1,107 @@
+import smtplib
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from flask_mail import Message
+from mongoengine.queryset.visitor import Q
+from app import mail
+from app.models import OutboxEmail
+
+# Persistent email outbox: web request sirf ek document insert karti hai (kuch ms),
+# worker batches mein ek hi SMTP connection par bhejta hai aur fail hone par
+# exponential backoff ke saath retry karta hai.
+
+
+def enqueue_email(subject, recipients, body, sender=None):
+    sender = sender or current_app.config['MAIL_DEFAULT_SENDER']
+    if isinstance(sender, str):
+        sender = [sender]
+    return OutboxEmail(
+        subject=subject,
+        sender=list(sender),
+        recipients=list(recipients),
+        body=body,
+    ).save()
+
+
+def _claim_batch(batch_size, lease_seconds):
+    # Har claim atomic hai, isliye kai workers ek saath chal sakte hain
+    now = datetime.utcnow()
+    claimable = Q(status='pending', next_attempt_at__lte=now) | Q(status='sending', locked_until__lt=now)
+    batch = []
+    for _ in range(batch_size):
+        email = OutboxEmail.objects(claimable).order_by('next_attempt_at').modify(
+            new=True,
+            set__status='sending',
+            set__locked_until=now + timedelta(seconds=lease_seconds),
+        )
+        if email is None:
+            break
+        batch.append(email)
+    return batch
+
+
+def _to_message(email):
+    sender = tuple(email.sender) if len(email.sender) == 2 else email.sender[0]
+    return Message(email.subject, sender=sender, recipients=email.recipients, body=email.body)
+
+
+def _retry_later(email, error, permanent=False):
+    config = current_app.config
+    attempts = email.attempts + 1
+    if permanent or attempts >= config['OUTBOX_MAX_ATTEMPTS']:
+        email.update(set__status='failed', set__attempts=attempts, set__last_error=str(error))
+        return
+    delay = min(config['OUTBOX_BACKOFF_BASE'] * 2 ** (attempts - 1), config['OUTBOX_BACKOFF_MAX'])
+    email.update(
+        set__status='pending',
+        set__attempts=attempts,
+        set__last_error=str(error),
+        set__next_attempt_at=datetime.utcnow() + timedelta(seconds=delay),
+    )
+
+
+def drain_outbox(batch_size=None):
+    """Send one batch over a single SMTP connection; returns (sent, failed)."""
+    config = current_app.config
+    batch = _claim_batch(batch_size or config['OUTBOX_BATCH_SIZE'], config['OUTBOX_LEASE_SECONDS'])
+    if not batch:
+        return 0, 0
+
+    sent = failed = 0
+    try:
+        with mail.connect() as connection:
+            for email in batch:
+                try:
+                    connection.send(_to_message(email))
+                except (smtplib.SMTPException, OSError) as e:
+                    _retry_later(email, e)
+                    failed += 1
+                    continue
+                except Exception as e:
+                    # Message hi kharab hai (e.g. BadHeaderError): retry se kuch nahi badlega.
+                    # Yahan na pakda toh batch 'sending' mein atak jaata aur lease ke baad
+                    # wahi email bina attempts badhaye phir se aata
+                    _retry_later(email, e, permanent=True)
+                    failed += 1
+                    continue
+                email.update(set__status='sent', set__sent_at=datetime.utcnow(), unset__locked_until=1)
+                sent += 1
+    except (smtplib.SMTPException, OSError) as e:
+        # Connection hi nahi bana/toot gaya: baaki claimed emails wapas queue mein
+        for email in batch[sent + failed:]:
+            _retry_later(email, e)
+            failed += 1
+    return sent, failed
+
+
+def run_worker(poll_interval=None, once=False, log=print):
+    poll_interval = poll_interval or current_app.config['OUTBOX_POLL_INTERVAL']
+    while True:
+        sent, failed = drain_outbox()
+        if sent or failed:
+            log(f"outbox: sent={sent} failed={failed}")
+        if once:
+            return
+        if not sent and not failed:
+            time.sleep(poll_interval)
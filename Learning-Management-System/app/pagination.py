@@ -0,0 +1,41 @@
+import base64
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+from flask import abort
+from mongoengine.queryset.visitor import Q
+
+
+# Keyset (cursor) pagination: skip()/offset ki jagah "is (date, _id) ke baad wale"
+# rows maangte hain, taaki har page index se fixed cost mein aaye.
+
+def encode_cursor(doc, field):
+    raw = f"{getattr(doc, field).isoformat()}|{doc.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        value, doc_id = raw.split('|')
+        return datetime.fromisoformat(value), ObjectId(doc_id)
+    except (ValueError, InvalidId, UnicodeDecodeError):
+        abort(400)
+
+
+def keyset_page(queryset, field, after=None, per_page=24, descending=True, loader=list):
+    """Return `(items, next_cursor)`; `next_cursor` is None on the last page.
+
+    `loader` turns the final queryset into items (e.g. read_models.course_cards).
+    """
+    op, sign = ('lt', '-') if descending else ('gt', '')
+    if after:
+        value, last_id = decode_cursor(after)
+        queryset = queryset.filter(
+            Q(**{f'{field}__{op}': value}) | Q(**{field: value, f'id__{op}': last_id})
+        )
+
+    # Ek extra row fetch karke pata chalta hai ki agla page hai ya nahi
+    items = loader(queryset.order_by(f'{sign}{field}', f'{sign}id').limit(per_page + 1))
+    next_cursor = encode_cursor(items[per_page - 1], field) if len(items) > per_page else None
+    return items[:per_page], next_cursor
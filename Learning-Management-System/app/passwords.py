@@ -0,0 +1,49 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the bcrypt pool could not take the job within BCRYPT_QUEUE_TIMEOUT."""
+
+
+class PasswordHasher:
+    """Runs bcrypt (via the Flask-Bcrypt extension) on a bounded thread pool.
+
+    bcrypt GIL chhod deta hai, isliye pool size ~ CPU cores rakhne se login storm
+    mein bhi CPU oversubscribe nahi hota aur baaki requests (jo bcrypt nahi karti)
+    chalti rehti hain. Cost factor Config.BCRYPT_LOG_ROUNDS se aata hai.
+    """
+
+    def __init__(self, bcrypt=None):
+        self.bcrypt = bcrypt
+        self.log_rounds = 12
+        self.timeout = None
+        self._executor = None
+
+    def init_app(self, app, bcrypt=None):
+        self.bcrypt = bcrypt or self.bcrypt
+        self.log_rounds = app.config.get('BCRYPT_LOG_ROUNDS', 12)
+        self.timeout = app.config.get('BCRYPT_QUEUE_TIMEOUT')
+        workers = app.config.get('BCRYPT_MAX_WORKERS') or os.cpu_count() or 1
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+
+    def _run(self, fn, *args):
+        future = self._executor.submit(fn, *args)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise PasswordHasherBusy()
+
+    def hash(self, password):
+        return self._run(self.bcrypt.generate_password_hash, password).decode('utf-8')
+
+    def check(self, hashed, password):
+        return self._run(self.bcrypt.check_password_hash, hashed, password)
+
+    def needs_rehash(self, hashed):
+        # bcrypt format: $2b$<cost>$<salt+hash>
+        try:
+            return int(hashed.split('$')[2]) != self.log_rounds
+        except (AttributeError, IndexError, ValueError):
+            return True
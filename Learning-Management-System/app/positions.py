@@ -0,0 +1,95 @@
+import atexit
+import logging
+import threading
+from datetime import datetime
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+# Video watch-position heartbeats. Har request sirf memory mein likhti hai
+# (har (student, lesson) ki latest value); background thread har
+# POSITION_FLUSH_SECONDS mein sab ek unordered bulk_write mein UserProgress
+# par daal deta hai. Buffer per worker process hai - crash par max ek interval
+# ki positions jaati hain, jo resume ke liye chalta hai.
+
+log = logging.getLogger(__name__)
+
+
+class PositionBuffer:
+    """Coalescing in-memory buffer of (student, lesson) -> latest position."""
+
+    def __init__(self, flush_interval=5, max_pending=50000):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.flushed_writes = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def init_app(self, app):
+        self.flush_interval = app.config.get('POSITION_FLUSH_SECONDS', self.flush_interval)
+        self.max_pending = app.config.get('POSITION_BUFFER_MAX', self.max_pending)
+        atexit.register(self.flush)
+
+    def record(self, student_id, course_id, lesson_id, seconds):
+        with self._lock:
+            self._pending[(student_id, lesson_id)] = (course_id, seconds)
+            overflow = len(self._pending) >= self.max_pending
+        self._ensure_thread()
+        if overflow:
+            self._wake.set()  # interval ka wait mat karo
+
+    def pending(self, student_id, lesson_id):
+        """Buffered (not yet flushed) position, or None."""
+        entry = self._pending.get((student_id, lesson_id))
+        return entry[1] if entry else None
+
+    def size(self):
+        return len(self._pending)
+
+    def _ensure_thread(self):
+        # Lazily: gunicorn fork ke baad har worker ka apna thread
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='position-flush', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except PyMongoError as e:
+                log.warning("Position flush failed: %s", e)
+
+    def flush(self):
+        """Write every buffered position in one unordered bulk_write; returns the op count."""
+        from app.models import UserProgress
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return 0
+        now = datetime.utcnow()
+        ops = [
+            UpdateOne(
+                {'student': student_id, 'course': course_id},
+                {'$set': {f'positions.{lesson_id}': seconds, 'last_updated': now}},
+                upsert=True,
+            )
+            for (student_id, lesson_id), (course_id, seconds) in batch.items()
+        ]
+        try:
+            UserProgress._get_collection().bulk_write(ops, ordered=False)
+        except PyMongoError:
+            # Fail hua toh wapas buffer mein (jo naya aa chuka hai woh jeetega)
+            with self._lock:
+                for key, value in batch.items():
+                    self._pending.setdefault(key, value)
+            raise
+        self.flushed_writes += len(ops)
+        return len(ops)
+
+
+position_buffer = PositionBuffer()
@@ -0,0 +1,127 @@
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from functools import wraps
+from flask import request
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+from werkzeug.exceptions import TooManyRequests
+
+# Token-bucket rate limiting (login / password reset / OTP). Check view ke
+# andar sabse pehle hota hai - limit par request ko na DB lookup milta hai na bcrypt.
+#  - memory (default): per worker process, striped locks (ek global lock nahi)
+#  - mongo: sab workers ke liye shared, `rate_limits` collection (TTL se saaf hota hai)
+
+log = logging.getLogger(__name__)
+
+LOCK_STRIPES = 64
+
+
+def parse_rate(spec):
+    """'5/300' -> (capacity 5, refill 5/300 tokens per second)."""
+    count, seconds = spec.split('/')
+    return int(count), int(count) / float(seconds)
+
+
+class MemoryStore:
+    def __init__(self, max_keys=100000):
+        # Har stripe ka apna lock + LRU OrderedDict; limit par sabse purana bucket
+        # O(1) mein nikalta hai (distinct keys ki flood mein bhi har hit sasta)
+        self.max_per_stripe = max(1, max_keys // LOCK_STRIPES)
+        self._stripes = [(threading.Lock(), OrderedDict()) for _ in range(LOCK_STRIPES)]
+
+    def hit(self, key, capacity, rate):
+        now = time.monotonic()
+        lock, buckets = self._stripes[hash(key) % LOCK_STRIPES]
+        with lock:
+            tokens, updated = buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            buckets[key] = (tokens, now)  # end = most recently used
+            while len(buckets) > self.max_per_stripe:
+                buckets.popitem(last=False)
+        return allowed, 0 if allowed else (1 - tokens) / rate
+
+
+class MongoStore:
+    def hit(self, key, capacity, rate):
+        from app.models import RateLimitBucket
+        elapsed = {'$divide': [{'$subtract': ['$$NOW', {'$ifNull': ['$updated', '$$NOW']}]}, 1000]}
+        # Ek atomic pipeline update: refill, phir ek token lo (agar hai)
+        doc = RateLimitBucket._get_collection().find_one_and_update(
+            {'_id': key},
+            [
+                {'$set': {'tokens': {'$min': [capacity, {'$add': [
+                    {'$ifNull': ['$tokens', capacity]}, {'$multiply': [elapsed, rate]},
+                ]}]}}},
+                {'$set': {
+                    'allowed': {'$gte': ['$tokens', 1]},
+                    'tokens': {'$cond': [{'$gte': ['$tokens', 1]}, {'$subtract': ['$tokens', 1]}, '$tokens']},
+                    'updated': '$$NOW',
+                    'expires_at': {'$add': ['$$NOW', int(capacity / rate * 1000)]},
+                }},
+            ],
+            projection={'tokens': 1, 'allowed': 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        allowed = doc['allowed']
+        return allowed, 0 if allowed else (1 - doc['tokens']) / rate
+
+
+class RateLimiter:
+    """Flask extension: `@limiter.limit('login', account=...)` on POST handlers."""
+
+    def __init__(self):
+        self.enabled = True
+        self.rules = {}
+        self.store = MemoryStore()
+        self.rejections = Counter()
+
+    def init_app(self, app):
+        self.enabled = app.config.get('RATELIMIT_ENABLED', True)
+        self.rules = {
+            rule: {scope: parse_rate(spec) for scope, spec in scopes.items()}
+            for rule, scopes in app.config.get('RATE_LIMITS', {}).items()
+        }
+        if app.config.get('RATELIMIT_STORAGE', 'memory') == 'mongo':
+            self.store = MongoStore()
+        else:
+            self.store = MemoryStore(app.config.get('RATELIMIT_MAX_KEYS', 100000))
+
+    def check(self, rule, account=None):
+        """Consume one token per scope (ip, account); raises 429 if any bucket is empty."""
+        if not self.enabled or rule not in self.rules:
+            return
+        keys = {'ip': request.remote_addr or 'unknown', 'account': account}
+        for scope, (capacity, rate) in self.rules[rule].items():
+            if not keys.get(scope):
+                continue
+            try:
+                allowed, retry_after = self.store.hit(f"{rule}:{scope}:{keys[scope]}", capacity, rate)
+            except PyMongoError as e:
+                # Shared store down ho toh login band nahi karna (fail open)
+                log.warning("Rate limit store unavailable: %s", e)
+                return
+            if not allowed:
+                self.rejections[rule] += 1
+                raise TooManyRequests(retry_after=max(1, int(retry_after + 0.999)))
+
+    def limit(self, rule, account=None):
+        """Decorator; `account` is a callable returning the account key (e.g. the submitted email)."""
+        def decorator(view):
+            @wraps(view)
+            def wrapped(*args, **kwargs):
+                # GET sirf form dikhata hai; mehnga kaam POST par hota hai
+                if request.method == 'POST':
+                    self.check(rule, account() if account else None)
+                return view(*args, **kwargs)
+            return wrapped
+        return decorator
+
+
+def submitted_email():
+    return (request.form.get('email') or '').strip().lower() or None
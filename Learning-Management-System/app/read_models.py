@@ -0,0 +1,71 @@
+from app.models import User, Course
+
+# List pages ke liye halke read models: projected raw dicts (koi MongoEngine
+# Document nahi) ko chhote __slots__ objects mein wrap karte hain. Templates
+# inhe Document ki tarah hi padhte hain (course.title, course.instructor.username).
+
+DESCRIPTION_SNIPPET = 200  # cards par isse zyada description kabhi nahi dikhti
+
+
+class InstructorView:
+    __slots__ = ('id', 'username', 'profile_pic')
+
+    def __init__(self, id, username, profile_pic=None):
+        self.id = id
+        self.username = username
+        self.profile_pic = profile_pic
+
+
+class CourseCard:
+    __slots__ = ('id', 'title', 'description', 'price', 'is_active', 'is_hidden',
+                 'date_posted', 'date_created', 'instructor')
+
+    def __init__(self, son, instructor=None):
+        self.id = son['_id']
+        self.title = son.get('title', '')
+        self.description = son.get('description') or ''
+        self.price = son.get('price', 0)
+        self.is_active = son.get('is_active', True)
+        self.is_hidden = son.get('is_hidden', False)
+        self.date_posted = son.get('date_posted')
+        self.date_created = son.get('date_created')
+        self.instructor = instructor
+
+
+class EnrollmentRow:
+    __slots__ = ('id', 'progress', 'course')
+
+    def __init__(self, son, course=None):
+        self.id = son['_id']
+        self.progress = son.get('progress', 0)
+        self.course = course
+
+
+def _instructors_by_id(ids):
+    # Sirf username + avatar chahiye: ek $in query, projected
+    ids = list({i for i in ids if i is not None})
+    if not ids:
+        return {}
+    return {
+        row['_id']: InstructorView(row['_id'], row.get('username'), row.get('profile_pic'))
+        for row in User._get_collection().find({'_id': {'$in': ids}}, {'username': 1, 'profile_pic': 1})
+    }
+
+
+def course_cards(queryset):
+    """Load a Course queryset as CourseCards; description is cut server-side."""
+    rows = list(queryset.aggregate([{'$project': {
+        'title': 1, 'price': 1, 'is_active': 1, 'is_hidden': 1,
+        'date_posted': 1, 'date_created': 1, 'instructor': 1,
+        'description': {'$substrCP': [{'$ifNull': ['$description', '']}, 0, DESCRIPTION_SNIPPET]},
+    }}]))
+    instructors = _instructors_by_id(row.get('instructor') for row in rows)
+    return [CourseCard(row, instructors.get(row.get('instructor'))) for row in rows]
+
+
+def enrollment_rows(queryset):
+    """Load an Enrollment queryset as EnrollmentRows with their course cards attached."""
+    rows = list(queryset.only('course', 'progress').as_pymongo())
+    course_ids = list({row.get('course') for row in rows if row.get('course')})
+    courses = {card.id: card for card in course_cards(Course.objects(id__in=course_ids))} if course_ids else {}
+    return [EnrollmentRow(row, courses.get(row.get('course'))) for row in rows]
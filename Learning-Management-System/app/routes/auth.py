@@ -1,9 +1,11 @@
-from flask import Blueprint, render_template, url_for, flash, redirect, request, current_app
-from app import db, bcrypt, mail
+from flask import Blueprint, render_template, url_for, flash, redirect, request
+from app import db, passwords, limiter
+from app.passwords import PasswordHasherBusy
 from app.forms import RegistrationForm, LoginForm, RequestResetForm, ResetPasswordForm
 from app.models import User
 from flask_login import login_user, current_user, logout_user
-from flask_mail import Message
+from app.outbox import enqueue_email
+from app.ratelimit import submitted_email
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -15,7 +17,11 @@ def register():
     
     form = RegistrationForm()
     if form.validate_on_submit():
-        hashed_password = bcrypt.generate_password_hash(form.password.data).decode('utf-8')
+        try:
+            hashed_password = passwords.hash(form.password.data)
+        except PasswordHasherBusy:
+            flash('Server is busy right now, please try again in a moment.', 'warning')
+            return render_template('register.html', title='Register', form=form)
         user = User(
             username=form.username.data, 
             email=form.email.data, 
@@ -34,6 +40,7 @@ def register():
 
 # ---------------- LOGIN ROUTE ----------------
 @auth_bp.route('/login', methods=['GET', 'POST'])
+@limiter.limit('login', account=submitted_email)
 def login():
     if current_user.is_authenticated:
         return redirect(url_for('main.home'))
@@ -41,7 +48,19 @@ def login():
     form = LoginForm()
     if form.validate_on_submit():
         user = User.objects(email=form.email.data).first()
-        if user and bcrypt.check_password_hash(user.password, form.password.data):
+        try:
+            valid = user is not None and passwords.check(user.password, form.password.data)
+        except PasswordHasherBusy:
+            flash('Server is busy right now, please try again in a moment.', 'warning')
+            return render_template('login.html', title='Login', form=form)
+
+        if valid:
+            # Cost factor badla hai toh purana hash chupchaap naye cost par upgrade
+            if passwords.needs_rehash(user.password):
+                try:
+                    user.update(set__password=passwords.hash(form.password.data))
+                except PasswordHasherBusy:
+                    pass  # agle login par ho jayega
             login_user(user, remember=form.remember.data)
             flash(f'Welcome back, {user.username}!', 'success')
             
@@ -59,18 +78,16 @@ def login():
 
 def send_reset_email(user):
     token = user.get_reset_token()
-    msg = Message('Password Reset Request - LearnHub',
-                  sender=current_app.config['MAIL_DEFAULT_SENDER'], # Config se sender uthaya
-                  recipients=[user.email])
-    
-    msg.body = f'''To reset your password, visit the following link:
+    body = f'''To reset your password, visit the following link:
 {url_for('auth.reset_token', token=token, _external=True)}
 
 If you did not make this request then simply ignore this email.
 '''
-    mail.send(msg)
+    # Sirf outbox mein daalo; SMTP worker bhejega (request block nahi hoti)
+    enqueue_email('Password Reset Request - LearnHub', [user.email], body)
 
 @auth_bp.route("/reset_password", methods=['GET', 'POST'])
+@limiter.limit('reset', account=submitted_email)
 def reset_request():
     if current_user.is_authenticated:
         return redirect(url_for('main.home'))
@@ -93,7 +110,11 @@ def reset_token(token):
         return redirect(url_for('auth.reset_request'))
     form = ResetPasswordForm()
     if form.validate_on_submit():
-        hashed_password = bcrypt.generate_password_hash(form.password.data).decode('utf-8')
+        try:
+            hashed_password = passwords.hash(form.password.data)
+        except PasswordHasherBusy:
+            flash('Server is busy right now, please try again in a moment.', 'warning')
+            return render_template('reset_token.html', title='Reset Password', form=form)
         user.update(set__password=hashed_password)
         flash('Your password has been updated! You can now log in.', 'success')
         return redirect(url_for('auth.login'))
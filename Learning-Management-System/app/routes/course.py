@@ -1,29 +1,34 @@
 import os
 from datetime import datetime
-from flask import Blueprint, render_template, url_for, flash, redirect, abort, request, current_app, jsonify
+from bson import ObjectId
+from flask import Blueprint, render_template, url_for, flash, redirect, abort, request, current_app, jsonify, send_file
 from flask_login import current_user, login_required
-from werkzeug.utils import secure_filename
-from app.models import Course, Lesson, Enrollment, UserProgress
+from app.cache import TTLCache
+from app.models import Course, Lesson, Enrollment, UserProgress, CourseStats
 from app.forms import CourseForm, LessonForm
+from app.catalog import explore_grid, bump_catalog_version, public_courses
+from app.pagination import keyset_page
+from app.read_models import course_cards
+from app.storage import store_upload, release_upload
+from app.routes.media import media_url
+from app.positions import position_buffer
+from app.search import search_catalog
+from app.certificates import artifact_path, render_certificate, write_artifact, invalidate_course
 
 # Blueprint definition
 course_bp = Blueprint('courses', __name__)
 
+# (user, lesson) -> (course_id, lesson_id); heartbeats ka enrollment check ek hi baar
+_watch_access = TTLCache(maxsize=8192, ttl=600)
+MAX_POSITION_SECONDS = 24 * 3600
+
 # --- Helper Function to save files ---
 def save_uploaded_file(file_data, folder_name):
     if not file_data:
         return None 
     
-    filename = secure_filename(file_data.filename)
-    # Unique timestamp needed specifically for updates so browser doesn't cache old file
-    filename = f"{int(datetime.now().timestamp())}_{filename}"
-    upload_path = os.path.join(current_app.root_path, 'static/uploads', folder_name)
-    
-    if not os.path.exists(upload_path):
-        os.makedirs(upload_path)
-
-    file_data.save(os.path.join(upload_path, filename))
-    return filename
+    # Content-addressed (sha256) naam: duplicate upload disk par dobara nahi likhi jaati
+    return store_upload(file_data, folder_name)
 
 
 # ==========================================
@@ -33,14 +38,65 @@ def save_uploaded_file(file_data, folder_name):
 @course_bp.route('/explore')
 @login_required
 def explore():
-    # 1. Fetch all active public courses
-    courses = Course.objects(is_active=True, is_hidden=False)
-    
-    # 2. Find which courses student already bought
-    my_enrollments = Enrollment.objects(student=current_user)
+    # 1. Find which courses student already bought (sirf ids chahiye, dereference nahi)
+    my_enrollments = Enrollment.objects(student=current_user).only('course').no_dereference()
     enrolled_ids = [e.course.id for e in my_enrollments]
-    
-    return render_template('explore_courses.html', courses=courses, enrolled_ids=enrolled_ids)
+
+    # 2. Shared cached grid + is user ke buttons (app/catalog.py), ek page at a time
+    grid_html, next_cursor = explore_grid(enrolled_ids, after=request.args.get('after'))
+    return render_template('explore_courses.html', grid_html=grid_html, next_cursor=next_cursor)
+
+
+@course_bp.route('/api/list')
+@login_required
+def api_list():
+    # Infinite scroll ke liye compact JSON pages: /courses/api/list?after=<cursor>&limit=24
+    limit = request.args.get('limit', current_app.config['COURSES_PER_PAGE'], type=int)
+    limit = max(1, min(limit, current_app.config['API_MAX_PAGE_SIZE']))
+    courses, next_cursor = keyset_page(
+        public_courses(), 'date_posted', request.args.get('after'), per_page=limit, loader=course_cards
+    )
+    return jsonify({
+        "courses": [{
+            "id": str(course.id),
+            "title": course.title,
+            "price": course.price,
+            "instructor": course.instructor.username if course.instructor else None,
+            "url": url_for('courses.view_course', course_id=course.id),
+        } for course in courses],
+        "next": next_cursor,
+    })
+
+
+@course_bp.route('/search')
+@login_required
+def search():
+    query = request.args.get('q', '')
+    page = request.args.get('page', 1, type=int)
+    results = search_catalog(query, page=page)
+    return render_template('search_results.html', query=query, page=page, results=results)
+
+
+@course_bp.route('/api/search')
+@login_required
+def api_search():
+    results = search_catalog(request.args.get('q', ''), page=request.args.get('page', 1, type=int))
+    return jsonify({
+        "courses": [{
+            "id": str(course.id),
+            "title": course.title,
+            "price": course.price,
+            "instructor": course.instructor.username if course.instructor else None,
+            "url": url_for('courses.view_course', course_id=course.id),
+        } for course in results['courses']],
+        "lessons": [{
+            "id": str(lesson.id),
+            "title": lesson.title,
+            "course": lesson.course.title,
+            "url": url_for('courses.view_course', course_id=lesson.course.id),
+        } for lesson in results['lessons']],
+        "has_more": results['has_more'],
+    })
 
 
 @course_bp.route('/course/<course_id>/enroll', methods=['POST'])
@@ -50,19 +106,17 @@ def enroll_course(course_id):
         flash('Only students can enroll.', 'danger')
         return redirect(url_for('main.home'))
     
-    course = Course.objects.get_or_404(id=course_id)
-    
-    # 1. Check if already enrolled
-    existing = Enrollment.objects(student=current_user, course=course).first()
-    if existing:
-        return redirect(url_for('courses.view_course', course_id=course.id))
+    course = Course.objects.only('title', 'price', 'is_active').get_or_404(id=course_id)
+    if not course.is_active:
+        abort(404)
     
-    # 2. Check Price Logic (Redirect to Payment if Paid)
+    # 1. Paid course: payment page (wahan already-enrolled check hota hai)
     if course.price > 0:
         return redirect(url_for('courses.payment_page', course_id=course.id))
     
-    # 3. If Free, Direct Enroll
-    Enrollment(student=current_user, course=course).save()
+    # 2. Free: ek atomic upsert - double click / retry duplicate nahi banata
+    if not Enrollment.enroll(current_user.id, course.id):
+        return redirect(url_for('courses.view_course', course_id=course.id))
     flash(f'Enrolled in {course.title}!', 'success')
         
     return redirect(url_for('dashboard.student_index'))
@@ -72,38 +126,42 @@ def enroll_course(course_id):
 @login_required
 def payment_page(course_id):
     course = Course.objects.get_or_404(id=course_id)
+    if Enrollment.objects(student=current_user.id, course=course.id).only('id').first():
+        return redirect(url_for('courses.view_course', course_id=course.id))
     return render_template('payment.html', course=course)
 
 
 @course_bp.route('/payment/<course_id>/process', methods=['POST'])
 @login_required
 def process_payment(course_id):
-    course = Course.objects.get_or_404(id=course_id)
+    if current_user.role != 'student':
+        flash('Only students can enroll.', 'danger')
+        return redirect(url_for('main.home'))
+    course = Course.objects.only('title', 'price', 'is_active').get_or_404(id=course_id)
+    if not course.is_active:
+        abort(404)
     
     # Mock Payment Logic (Here you would integrate Stripe/Razorpay)
-    fake_txn_id = f"PAY_{int(datetime.now().timestamp())}_{current_user.id}"
-    
-    # Save Enrollment
-    Enrollment(
-        student=current_user, 
-        course=course,
-        amount_paid=course.price,
-        transaction_id=fake_txn_id,
-        payment_status='completed'
-    ).save()
+    # Transaction id (student, course) se derive hota hai: retried POST wahi id bhejta hai
+    txn_id = Enrollment.transaction_key(current_user.id, course.id)
     
-    flash(f'Payment Successful! You are enrolled in {course.title}.', 'success')
+    if Enrollment.enroll(current_user.id, course.id, amount_paid=course.price, transaction_id=txn_id):
+        flash(f'Payment Successful! You are enrolled in {course.title}.', 'success')
+    else:
+        flash(f'You are already enrolled in {course.title}.', 'info')
     return redirect(url_for('courses.view_course', course_id=course.id))
 
 
 @course_bp.route('/<course_id>', methods=['GET', 'POST'])
 @login_required
 def view_course(course_id):
+    # Sidebar Course.outline se banta hai; lessons ka content /lesson/<id>/content se lazily
     course = Course.objects.get_or_404(id=course_id)
-    lessons = Lesson.objects(course=course).order_by('date_created')
     if not course.is_active:
         abort(404)
-    user_progress = None
+    course.ensure_outline()
+    completed_ids = set()
+    positions = {}
     enrollment = None
     
     if current_user.role == 'student':
@@ -111,25 +169,84 @@ def view_course(course_id):
         if not enrollment:
             flash('Please enroll to access this course.', 'warning')
             return redirect(url_for('courses.explore'))
-            
-        user_progress = UserProgress.objects(student=current_user, course=course).first()
+
+        progress = UserProgress._get_collection().find_one(
+            {'student': current_user.id, 'course': course.id}, {'completed_lessons': 1, 'positions': 1}
+        ) or {}
+        completed_ids = set(progress.get('completed_lessons', []))
+        positions = progress.get('positions', {})
+        # Jo heartbeats abhi flush nahi hue, woh bhi resume mein dikhen
+        for entry in course.outline:
+            buffered = position_buffer.pending(current_user.id, str(entry.lesson_id))
+            if buffered is not None:
+                positions[str(entry.lesson_id)] = buffered
 
     # Instructor Add Lesson Form Handling
     form = LessonForm()
     if form.validate_on_submit() and current_user == course.instructor:
         v_file = save_uploaded_file(form.video.data, 'videos')
         r_file = save_uploaded_file(form.resource_file.data, 'resources')
-        Lesson(
+        lesson = Lesson(
             title=form.title.data,
             content=form.content.data,
             course=course,
             video_filename=v_file,
             resource_filename=r_file
         ).save()
+        Course.add_to_outline(course.id, lesson)
         flash('Lesson added successfully!', 'success')
         return redirect(url_for('courses.view_course', course_id=course.id))
 
-    return render_template('view_course.html', course=course, lessons=lessons, form=form, user_progress=user_progress, enrollment=enrollment)
+    return render_template('view_course.html', course=course, form=form, completed_ids=completed_ids,
+                           positions=positions, enrollment=enrollment)
+
+
+@course_bp.route('/lesson/<lesson_id>/position', methods=['POST'])
+@login_required
+def save_position(lesson_id):
+    # Video heartbeat: sirf memory buffer mein jaata hai (app/positions.py);
+    # DB sirf pehli heartbeat par access check ke liye touch hota hai
+    if current_user.role != 'student':
+        return '', 204
+    data = request.get_json(silent=True) or {}
+    try:
+        seconds = round(float(data.get('position')), 1)
+    except (TypeError, ValueError):
+        abort(400)
+    if not 0 <= seconds <= MAX_POSITION_SECONDS:  # NaN/inf bhi yahin reject
+        abort(400)
+
+    key = (str(current_user.id), lesson_id)
+    access = _watch_access.get(key)
+    if access is None:
+        lesson = Lesson.objects.only('course').no_dereference().get_or_404(id=lesson_id)
+        if not Enrollment.objects(student=current_user.id, course=lesson.course.id).only('id').first():
+            abort(403)
+        access = (lesson.course.id, str(lesson.id))
+        _watch_access.set(key, access)
+
+    course_id, canonical_id = access
+    position_buffer.record(current_user.id, course_id, canonical_id, seconds)
+    return '', 204
+
+
+@course_bp.route('/lesson/<lesson_id>/content')
+@login_required
+def lesson_content(lesson_id):
+    # Sirf wahi lesson jo play ho raha hai; access rules view_course jaise hi
+    lesson = Lesson.objects.no_dereference().get_or_404(id=lesson_id)
+    course = Course.objects.only('is_active').get_or_404(id=lesson.course.id)
+    if not course.is_active:
+        abort(404)
+    if current_user.role == 'student' and not Enrollment.objects(student=current_user.id, course=course.id).only('id').first():
+        abort(403)
+    return jsonify({
+        "id": str(lesson.id),
+        "title": lesson.title,
+        "content": lesson.content,
+        "video_url": media_url(course, 'videos', lesson.video_filename),
+        "resource_url": media_url(course, 'resources', lesson.resource_filename),
+    })
 
 
 # ==========================================
@@ -141,8 +258,13 @@ def view_course(course_id):
 def instructor_index():
     if current_user.role != 'instructor':
         abort(403)
-    courses = Course.objects(instructor=current_user, is_active=True).order_by('date_created')
-    return render_template('dashboard_instructor.html', courses=courses)
+    courses, next_cursor = keyset_page(
+        Course.objects(instructor=current_user, is_active=True), 'date_created',
+        request.args.get('after'), per_page=current_app.config['COURSES_PER_PAGE'], descending=False
+    )
+    # Har course ka ek rollup document, ek hi query mein
+    stats = {s.course_id: s for s in CourseStats.objects(course_id__in=[c.id for c in courses])}
+    return render_template('dashboard_instructor.html', courses=courses, stats=stats, next_cursor=next_cursor)
 
 
 @course_bp.route('/new', methods=['GET', 'POST'])
@@ -163,6 +285,7 @@ def create_course():
                 video_filename=v_file,
                 resource_filename=r_file
             ).save()
+            bump_catalog_version()
             flash('Course Created Successfully!', 'success')
             return redirect(url_for('courses.instructor_index'))
         except Exception as e:
@@ -186,19 +309,22 @@ def edit_course(course_id):
             set__description=form.description.data,
             set__price=form.price.data  # 🟢 Update Price
         )
+        bump_catalog_version()
+        invalidate_course(course.id)  # title certificate par chhapta hai
 
         # 2. Add New Lesson via Edit Page (Optional)
         if form.video.data or form.resource_file.data:
             v_file = save_uploaded_file(form.video.data, 'videos')
             r_file = save_uploaded_file(form.resource_file.data, 'resources')
 
-            Lesson(
+            lesson = Lesson(
                 title=f"New Lesson: {datetime.now().strftime('%d %b')}",
                 content="Added via edit page.",
                 course=course,
                 video_filename=v_file,
                 resource_filename=r_file
             ).save()
+            Course.add_to_outline(course.id, lesson)
             flash('Course updated & new content added!', 'success')
         else:
             flash('Course details updated!', 'info')
@@ -210,7 +336,9 @@ def edit_course(course_id):
         form.description.data = course.description
         form.price.data = course.price  # 🟢 Pre-fill Price
         
-    return render_template('create_course.html', form=form, legend='Edit Course', course=course)
+    # Edit page ko filenames bhi chahiye, isliye yahan lessons collection se
+    lessons = Lesson.objects(course=course).only('title', 'video_filename', 'resource_filename').order_by('date_created')
+    return render_template('create_course.html', form=form, legend='Edit Course', course=course, lessons=lessons)
 
 
 @course_bp.route('/lesson/<lesson_id>/update', methods=['POST'])
@@ -229,23 +357,18 @@ def update_lesson_details(lesson_id):
     if 'video' in request.files:
         file = request.files['video']
         if file.filename != '':
-            if lesson.video_filename:
-                old_path = os.path.join(current_app.root_path, 'static/uploads/videos', lesson.video_filename)
-                if os.path.exists(old_path):
-                    os.remove(old_path)
+            release_upload('videos', lesson.video_filename)
             lesson.video_filename = save_uploaded_file(file, 'videos')
 
     # Replace Resource
     if 'resource' in request.files:
         file = request.files['resource']
         if file.filename != '':
-            if lesson.resource_filename:
-                old_path = os.path.join(current_app.root_path, 'static/uploads/resources', lesson.resource_filename)
-                if os.path.exists(old_path):
-                    os.remove(old_path)
+            release_upload('resources', lesson.resource_filename)
             lesson.resource_filename = save_uploaded_file(file, 'resources')
 
     lesson.save()
+    Course.update_outline(lesson.course.id, lesson)
     flash('Lesson updated successfully!', 'success')
     return redirect(url_for('courses.edit_course', course_id=lesson.course.id))
 
@@ -257,17 +380,22 @@ def update_lesson_details(lesson_id):
 @course_bp.route('/lesson/<lesson_id>/complete', methods=['POST'])
 @login_required
 def complete_lesson(lesson_id):
-    lesson = Lesson.objects.get_or_404(id=lesson_id)
-    progress = UserProgress.objects(student=current_user, course=lesson.course).first()
-    if not progress:
-        progress = UserProgress(student=current_user, course=lesson.course, completed_lessons=[]).save()
-    if lesson not in progress.completed_lessons:
-        progress.completed_lessons.append(lesson)
-        progress.save()
-
-    total = Lesson.objects(course=lesson.course).count()
-    percent = int((len(progress.completed_lessons) / total) * 100) if total > 0 else 0
-    Enrollment.objects(student=current_user, course=lesson.course).update(set__progress=percent)
+    # Sirf course ki id chahiye, poora course dereference nahi karna
+    lesson = Lesson.objects.only('course').no_dereference().get_or_404(id=lesson_id)
+    course_id = lesson.course.id
+    course = Course.objects.only('lesson_count').get_or_404(id=course_id)
+    course.ensure_outline()  # purane course: lesson_count 0 par progress hamesha 0% rehta
+
+    # Ek atomic upsert: multiple tabs se clicks bhi update lose nahi karenge
+    completed = UserProgress.mark_completed(current_user.id, course_id, lesson.id)
+
+    percent = course.progress_percent(completed)
+    # Purana progress wapas milta hai taaki stats rollup sirf delta $inc kare
+    previous = Enrollment.objects(student=current_user.id, course=course_id).only('progress').modify(
+        set__progress=percent
+    )
+    if previous:
+        CourseStats.record_progress(course_id, previous.progress, percent)
     return jsonify({"status": "success", "percent": percent})
 
 
@@ -277,6 +405,7 @@ def hide_course(course_id):
     course = Course.objects.get_or_404(id=course_id)
     if course.instructor == current_user:
         course.update(set__is_hidden=not course.is_hidden)
+        bump_catalog_version()
         flash('Course Visibility Updated', 'info')
     return redirect(url_for('courses.instructor_index'))
 
@@ -286,7 +415,8 @@ def hide_course(course_id):
 def soft_delete_course(course_id):
     course = Course.objects.get_or_404(id=course_id)
     if course.instructor == current_user:
-        course.update(set__is_active=False)
+        course.update(set__is_active=False, set__deactivated_at=datetime.utcnow())
+        bump_catalog_version()
         flash('Course Archived Successfully', 'warning')
     return redirect(url_for('courses.instructor_index'))
 
@@ -299,6 +429,8 @@ def toggle_certificate(course_id):
         abort(403)
         
     course.update(set__certificate_enabled=not course.certificate_enabled)
+    bump_catalog_version()
+    invalidate_course(course.id)
     status = "Enabled" if not course.certificate_enabled else "Disabled"
     flash(f'Certificate option is now {status}.', 'success')
     return redirect(url_for('courses.instructor_index'))
@@ -307,6 +439,16 @@ def toggle_certificate(course_id):
 @course_bp.route('/course/<course_id>/certificate')
 @login_required
 def get_certificate(course_id):
+    if not ObjectId.is_valid(course_id):
+        abort(404)
+
+    # Pehle se bana certificate: koi DB lookup ya template render nahi
+    path = artifact_path(course_id, current_user.id)
+    if os.path.exists(path):
+        response = send_file(path, mimetype='text/html', max_age=0)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+
     course = Course.objects.get_or_404(id=course_id)
     enrollment = Enrollment.objects(student=current_user, course=course).first()
 
@@ -322,7 +464,6 @@ def get_certificate(course_id):
         flash("Please complete 100% of the course to get the certificate.", "warning")
         return redirect(url_for('courses.view_course', course_id=course_id))
 
-    return render_template('certificate.html', 
-                           student=current_user, 
-                           course=course, 
-                           date=datetime.now().strftime("%d %B, %Y"))
\ No newline at end of file
+    html = render_certificate(current_user, course, datetime.now())
+    write_artifact(course.id, current_user.id, html)
+    return html
\ No newline at end of file
@@ -1,11 +1,17 @@
-import os
 import random
 import string
-from datetime import datetime
+from email_validator import validate_email, EmailNotValidError
 from flask import Blueprint, redirect, render_template, url_for, request, flash, current_app, abort
 from flask_login import login_required, current_user
-from werkzeug.utils import secure_filename
-from app.models import Course, Enrollment, User 
+from app import limiter
+from app.models import Enrollment, User
+from app.read_models import course_cards, enrollment_rows
+from app.catalog import bump_catalog_version, public_courses
+from app.storage import store_upload, release_upload
+from app.images import image_pipeline
+from app.pagination import keyset_page
+from app.outbox import enqueue_email
+from app.certificates import invalidate_instructor
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
@@ -14,30 +20,21 @@ dashboard_bp = Blueprint('dashboard', __name__)
 def save_signature_file(file_data):
     if not file_data:
         return None
-    
-    filename = secure_filename(file_data.filename)
-    filename = f"sig_{current_user.id}_{int(datetime.now().timestamp())}_{filename}"
-    upload_path = os.path.join(current_app.root_path, 'static/uploads/signatures')
-    
-    if not os.path.exists(upload_path):
-        os.makedirs(upload_path)
-        
-    file_data.save(os.path.join(upload_path, filename))
+    filename = store_upload(file_data, 'signatures')
+    # Transparent PNG rendition background process pool mein banta hai; ban jaane
+    # par certificates dobara render hon taaki naya PNG use karein
+    instructor_id = current_user.id
+    image_pipeline.submit('signatures', filename, on_ready=lambda: invalidate_instructor(instructor_id))
     return filename
 
 # 🟢 NEW: Profile Picture Saver
 def save_profile_pic(file_data):
     if not file_data:
         return None
-    
-    filename = secure_filename(file_data.filename)
-    filename = f"pfp_{current_user.id}_{int(datetime.now().timestamp())}_{filename}"
-    upload_path = os.path.join(current_app.root_path, 'static/uploads/profile_pics')
-    
-    if not os.path.exists(upload_path):
-        os.makedirs(upload_path)
-        
-    file_data.save(os.path.join(upload_path, filename))
+    filename = store_upload(file_data, 'profile_pics')
+    # thumb/medium renditions background mein; tab tak templates original dikhate hain.
+    # Ban jaane par catalog version bump, taaki cached cards thumb use karein
+    image_pipeline.submit('profile_pics', filename, on_ready=bump_catalog_version)
     return filename
 
 def generate_otp():
@@ -78,12 +75,15 @@ def instructor_profile():
                     set__twitter_url=request.form.get('twitter'),
                     set__website_url=request.form.get('website')
                 )
+                # Username catalog cards par dikhta hai
+                bump_catalog_version()
                 
                 # 2. Profile Picture Upload
                 if 'profile_pic' in request.files:
                     file = request.files['profile_pic']
                     if file.filename != '':
                         new_pfp = save_profile_pic(file)
+                        release_upload('profile_pics', current_user.profile_pic)
                         current_user.update(set__profile_pic=new_pfp)
 
                 # 3. Signature Upload
@@ -91,8 +91,11 @@ def instructor_profile():
                     file = request.files['signature']
                     if file.filename != '':
                         new_sig = save_signature_file(file)
+                        release_upload('signatures', current_user.signature_filename)
                         current_user.update(set__signature_filename=new_sig)
                 
+                # Naam/signature certificates par hai: purane artifacts hatao
+                invalidate_instructor(current_user.id)
                 flash('Profile updated successfully!', 'success')
             
             except Exception as e:
@@ -102,11 +105,20 @@ def instructor_profile():
 
         # 🟢 CASE 2: Email Change Request
         elif 'request_email_change' in request.form:
-            new_email = request.form.get('email')
+            # Har request ek OTP email bhejti hai
+            limiter.check('otp_send', str(current_user.id))
+            new_email = (request.form.get('email') or '').strip()
             
             if not new_email or new_email == current_user.email:
                 flash('Please enter a different email address.', 'warning')
                 return redirect(url_for('dashboard.instructor_profile'))
+
+            # Raw form value seedha email header mein jaata hai - pehle validate
+            try:
+                validate_email(new_email, check_deliverability=False)
+            except EmailNotValidError:
+                flash('Please enter a valid email address.', 'warning')
+                return redirect(url_for('dashboard.instructor_profile'))
             
             if User.objects(email=new_email).first():
                 flash('This email is already registered.', 'danger')
@@ -118,9 +130,14 @@ def instructor_profile():
                 set__pending_new_email=new_email
             )
             
-            print(f"DEBUG: OTP for {current_user.username} is: {otp}")
+            enqueue_email(
+                'Verify your new email - LearnHub',
+                [new_email],
+                f"Hi {current_user.username},\n\nYour LearnHub verification code is: {otp}\n\n"
+                "If you did not request this change, please ignore this email.\n"
+            )
             
-            flash('Verification code sent! Check your console/email.', 'info')
+            flash('Verification code sent! Check your new email inbox.', 'info')
             return redirect(url_for('dashboard.verify_email_change'))
 
     return render_template('instructor_profile.html')
@@ -128,6 +145,7 @@ def instructor_profile():
 
 @dashboard_bp.route('/instructor/verify-email', methods=['GET', 'POST'])
 @login_required
+@limiter.limit('otp_verify', account=lambda: str(current_user.id))
 def verify_email_change():
     if not current_user.pending_new_email:
         flash('No pending email change request found.', 'warning')
@@ -155,13 +173,18 @@ def verify_email_change():
 def student_index():
     if current_user.role != 'student':
         return redirect(url_for('dashboard.index'))
-    all_enrollments = Enrollment.objects(student=current_user)
-
-    enrolled = Enrollment.objects(student=current_user)
-    enrolled_ids = [e.course.id for e in enrolled]
-    active_enrollments = [e for e in all_enrollments if e.course.is_active]
-    available = Course.objects(id__nin=enrolled_ids, is_active=True, is_hidden=False)
+    # Projected read models: enrollments + unke courses, ek-ek query mein
+    all_enrollments = enrollment_rows(Enrollment.objects(student=current_user))
+
+    enrolled_ids = [e.course.id for e in all_enrollments if e.course]
+    active_enrollments = [e for e in all_enrollments if e.course and e.course.is_active]
+    # Bounded page; $nin sirf index scan ke dauraan filter hai
+    available, next_cursor = keyset_page(
+        public_courses().filter(id__nin=enrolled_ids), 'date_posted',
+        request.args.get('after'), per_page=current_app.config['COURSES_PER_PAGE'], loader=course_cards
+    )
     
     return render_template('student_dashboard.html', 
                            enrolled_courses=active_enrollments, 
-                           available_courses=available)
\ No newline at end of file
+                           available_courses=available,
+                           next_cursor=next_cursor)
\ No newline at end of file
@@ -0,0 +1,105 @@
+import hashlib
+import mimetypes
+import os
+import posixpath
+import re
+from bson import ObjectId
+from flask import Blueprint, current_app, abort, request, send_file, url_for
+from flask_login import current_user, login_required
+from werkzeug.security import safe_join
+from app.cache import TTLCache
+from app.models import Course, Lesson, Enrollment
+
+# Lesson videos / resources ke liye dedicated serving:
+#  - enrollment check ek baar, phir (user, file) ka result cache (video player
+#    seek karte waqt bahut saari Range requests bhejta hai)
+#  - Range/206 + strong ETag, ya X-Sendfile / X-Accel-Redirect se web server ko hand-off
+media_bp = Blueprint('media', __name__)
+
+MEDIA_FOLDERS = {'videos': 'video_filename', 'resources': 'resource_filename'}
+# Content-addressed store ke naam: <sha256><ext> (see app/storage.py)
+SHA256_NAME = re.compile(r'^[0-9a-f]{64}$')
+
+_access_cache = TTLCache(maxsize=4096, ttl=300)
+
+
+@media_bp.before_app_request
+def block_static_media():
+    # Videos/resources bhi static/uploads mein hi hain; Flask ka static route unhe
+    # bina enrollment check ke de deta. Sirf /media se milenge (profile pics /
+    # signatures public hi rehte hain). nginx par bhi yeh folders sirf internal location se.
+    if request.endpoint == 'static':
+        parts = posixpath.normpath(request.view_args.get('filename', '')).split('/')
+        if len(parts) > 1 and parts[0] == 'uploads' and parts[1] in MEDIA_FOLDERS:
+            abort(404)
+
+
+def _etag(folder, filename, path):
+    stem = os.path.splitext(filename)[0]
+    if SHA256_NAME.match(stem):
+        return stem  # naam hi content hash hai
+    # Purane (timestamp-named) files: naam + size
+    return hashlib.sha1(f"{folder}/{filename}:{os.path.getsize(path)}".encode()).hexdigest()
+
+
+@media_bp.app_template_global()
+def media_url(course, folder, filename):
+    # Empty string = "no file" (view_course.html ka JS isi ko check karta hai)
+    if not filename:
+        return ''
+    return url_for('media.serve', course_id=course.id, folder=folder, filename=filename)
+
+
+def _has_access(course_id, folder, filename):
+    key = (str(current_user.id), course_id, folder, filename)
+    if _access_cache.get(key):
+        return True
+
+    field = MEDIA_FOLDERS[folder]
+    course = Course.objects(id=course_id).only('instructor', 'is_active', field).no_dereference().first()
+    allowed = False
+    if course and course.is_active:
+        # File sach mein isi course (intro ya kisi lesson) ki honi chahiye
+        owns_file = getattr(course, field) == filename or \
+            Lesson.objects(course=course_id, **{field: filename}).only('id').first() is not None
+        if owns_file:
+            is_instructor = course.instructor and course.instructor.id == current_user.id
+            allowed = bool(is_instructor) or \
+                Enrollment.objects(student=current_user.id, course=course_id).only('id').first() is not None
+
+    # Sirf "allowed" cache karo; enroll karte hi access milna chahiye
+    if allowed:
+        _access_cache.set(key, allowed)
+    return allowed
+
+
+@media_bp.route('/<course_id>/<folder>/<path:filename>')
+@login_required
+def serve(course_id, folder, filename):
+    if folder not in MEDIA_FOLDERS or not ObjectId.is_valid(course_id):
+        abort(404)
+    if not _has_access(course_id, folder, filename):
+        abort(403)
+
+    path = safe_join(os.path.join(current_app.root_path, 'static/uploads', folder), filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+
+    # Filenames content-addressed (sha256) hain, wahi strong ETag hai
+    max_age = current_app.config['MEDIA_MAX_AGE']
+    etag = _etag(folder, filename, path)
+
+    accel_prefix = current_app.config.get('MEDIA_ACCEL_REDIRECT_PREFIX')
+    if accel_prefix:
+        # nginx khud Range/206 handle karega; Python worker ek byte bhi stream nahi karta
+        response = current_app.response_class()
+        response.headers['X-Accel-Redirect'] = f"{accel_prefix.rstrip('/')}/{folder}/{filename}"
+        response.mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response.set_etag(etag)
+    else:
+        # USE_X_SENDFILE=True ho toh send_file X-Sendfile header bhejta hai
+        response = send_file(path, conditional=True, etag=etag, max_age=max_age)
+
+    response.headers['Cache-Control'] = f'private, max-age={max_age}, immutable'
+    response.headers['Accept-Ranges'] = 'bytes'
+    return response
@@ -0,0 +1,36 @@
+import hmac
+from flask import Blueprint, Response, abort, current_app, request
+from app import limiter, query_metrics, user_cache
+from app.catalog import fragment_cache
+from app.positions import position_buffer
+
+# Prometheus scrape endpoint. Data per worker process hai, isliye scraper ko
+# har worker alag se scrape karna chahiye (ya ek hi worker ho).
+metrics_bp = Blueprint('metrics', __name__)
+
+
+def _cache_gauges(prefix, cache):
+    stats = cache.stats()
+    return [
+        (f'{prefix}_size', 'Entries currently cached.', stats['size']),
+        (f'{prefix}_hits', 'Cache hits since start.', stats['hits']),
+        (f'{prefix}_misses', 'Cache misses since start.', stats['misses']),
+        (f'{prefix}_hit_ratio', 'Hits / (hits + misses).', stats['hit_ratio']),
+    ]
+
+
+@metrics_bp.route('/metrics')
+def metrics():
+    token = current_app.config.get('METRICS_TOKEN')
+    if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        abort(401)
+    gauges = _cache_gauges('lms_user_cache', user_cache) + _cache_gauges('lms_catalog_cache', fragment_cache)
+    gauges += [
+        ('lms_position_buffer_size', 'Watch positions waiting for the next flush.', position_buffer.size()),
+        ('lms_position_flushed_writes', 'Watch-position upserts written since start.', position_buffer.flushed_writes),
+    ]
+    gauges += [
+        (f'lms_ratelimit_rejections_{rule}', f'Requests rejected by the {rule} rate limit.', count)
+        for rule, count in sorted(limiter.rejections.items())
+    ]
+    return Response(query_metrics.render(gauges), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,242 @@
+import hashlib
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from flask import Blueprint, request, current_app, jsonify, abort, url_for
+from flask_login import current_user, login_required
+from mongoengine.queryset.visitor import Q
+from app.cache import TTLCache
+from app.models import Upload, Lesson, Course
+from app.storage import store_local_file, release_upload, file_sha256
+
+# Resumable chunked uploads (tus jaisa protocol):
+#   POST   /uploads/                 -> create (Upload-Length + filename/folder)
+#   HEAD   /uploads/<id>             -> current Upload-Offset (resume ke liye)
+#   PATCH  /uploads/<id>             -> append chunk at Upload-Offset
+#   POST   /uploads/<id>/finalize    -> hash verify + Lesson/Course par attach
+uploads_bp = Blueprint('uploads', __name__)
+
+TUS_VERSION = '1.0.0'
+ALLOWED_EXTENSIONS = {
+    'videos': {'mp4', 'mov', 'avi', 'mkv'},
+    'resources': {'pdf', 'docx', 'zip', 'pptx', 'jpg', 'png'},
+}
+CHUNK_READ_SIZE = 1024 * 1024
+
+# Har worker apne running sha256 objects rakhta hai; doosre worker par chunk gaya
+# toh finalize disk se dobara hash kar lega.
+_hashers = TTLCache(maxsize=256, ttl=6 * 3600)
+
+
+# --- Helpers ---
+
+def partial_dir():
+    path = os.path.join(current_app.instance_path, 'partial_uploads')
+    if not os.path.exists(path):
+        os.makedirs(path)
+    return path
+
+
+def partial_path(upload):
+    return os.path.join(partial_dir(), f"{upload.id}.part")
+
+
+def _tus_response(body=None, status=204, **headers):
+    response = jsonify(body) if body is not None else current_app.response_class(status=status)
+    response.status_code = status
+    response.headers['Tus-Resumable'] = TUS_VERSION
+    for name, value in headers.items():
+        response.headers[name.replace('_', '-')] = str(value)
+    return response
+
+
+def _claim_offset(upload, offset, lease_seconds):
+    """Atomically lease `offset` for this request; returns the lease token or None."""
+    now = datetime.utcnow()
+    token = uuid.uuid4().hex
+    claimed = Upload.objects(
+        Q(locked_until=None) | Q(locked_until__lt=now), id=upload.id, offset=offset, status='pending'
+    ).update(set__lease=token, set__locked_until=now + timedelta(seconds=lease_seconds))
+    return token if claimed else None
+
+
+def _renew_lease(upload, token, lease_seconds):
+    # False = lease kisi aur ke paas chala gaya (hum bahut der ruke rahe)
+    return bool(Upload.objects(id=upload.id, lease=token).update(
+        set__locked_until=datetime.utcnow() + timedelta(seconds=lease_seconds)
+    ))
+
+
+def _get_own_upload(upload_id):
+    # owner ka sirf id compare karna hai, User load karne ki zaroorat nahi
+    upload = Upload.objects.no_dereference().get_or_404(id=upload_id)
+    if upload.owner.id != current_user.id:
+        abort(403)
+    return upload
+
+
+# --- Routes ---
+
+@uploads_bp.route('/', methods=['POST'])
+@login_required
+def create_upload():
+    if current_user.role != 'instructor':
+        abort(403)
+
+    data = request.get_json(silent=True) or request.form
+    folder = data.get('folder')
+    filename = data.get('filename') or ''
+    length = request.headers.get('Upload-Length', type=int)
+    if length is None:
+        try:
+            length = int(data.get('length'))
+        except (TypeError, ValueError):
+            length = None
+
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if folder not in ALLOWED_EXTENSIONS or extension not in ALLOWED_EXTENSIONS[folder]:
+        return jsonify({"status": "error", "message": "Unsupported file type."}), 400
+    if not length or length < 0 or length > current_app.config['UPLOAD_MAX_SIZE']:
+        return jsonify({"status": "error", "message": "Invalid Upload-Length."}), 413
+
+    upload = Upload(owner=current_user.id, folder=folder, filename=filename, length=length).save()
+    open(partial_path(upload), 'wb').close()
+    _hashers.set(str(upload.id), (0, hashlib.sha256()))
+
+    return _tus_response(
+        {"id": str(upload.id), "offset": 0},
+        status=201,
+        Location=url_for('uploads.upload_chunk', upload_id=upload.id),
+        Upload_Offset=0,
+    )
+
+
+@uploads_bp.route('/<upload_id>', methods=['HEAD'])
+@login_required
+def upload_status(upload_id):
+    upload = _get_own_upload(upload_id)
+    return _tus_response(status=200, Upload_Offset=upload.offset, Upload_Length=upload.length,
+                         Cache_Control='no-store')
+
+
+@uploads_bp.route('/<upload_id>', methods=['PATCH'])
+@login_required
+def upload_chunk(upload_id):
+    upload = _get_own_upload(upload_id)
+    if upload.status != 'pending':
+        abort(409)
+
+    offset = request.headers.get('Upload-Offset', type=int)
+    if offset != upload.offset:
+        # Client ko HEAD karke sahi offset se resume karna chahiye
+        return _tus_response({"offset": upload.offset}, status=409, Upload_Offset=upload.offset)
+
+    # Likhne se PEHLE offset claim: parallel PATCH (same offset) yahin 409 paata hai,
+    # warna dono file overwrite karte aur cached hash file se match na karta
+    lease_seconds = current_app.config['UPLOAD_CHUNK_LEASE_SECONDS']
+    token = _claim_offset(upload, offset, lease_seconds)
+    if token is None:
+        return _tus_response({"offset": upload.offset}, status=409, Upload_Offset=upload.offset)
+
+    cached = _hashers.get(str(upload.id))
+    sha = cached[1] if cached and cached[0] == offset else None
+
+    # Chunk ko seedha disk par stream karo; poora body memory mein nahi aata
+    written = 0
+    remaining = upload.length - offset
+    renewed_at = time.monotonic()
+    try:
+        with open(partial_path(upload), 'r+b') as f:
+            f.seek(offset)
+            f.truncate()
+            while remaining > 0:
+                block = request.stream.read(min(CHUNK_READ_SIZE, remaining))
+                if not block:
+                    break
+                # Aadha lease beetne par renew; fail = koi aur likh raha hai, ek byte bhi mat likho
+                if time.monotonic() - renewed_at > lease_seconds / 2:
+                    if not _renew_lease(upload, token, lease_seconds):
+                        abort(409)
+                    renewed_at = time.monotonic()
+                f.write(block)
+                if sha:
+                    sha.update(block)
+                written += len(block)
+                remaining -= len(block)
+    except Exception:
+        # Client beech mein gaya / lease chhina: hasher mein aadha chunk hai, aur lease
+        # turant chhodo taaki resume ko 5 minute 409 na mile
+        _hashers.invalidate(str(upload.id))
+        Upload.objects(id=upload.id, lease=token).update(unset__lease=1, unset__locked_until=1)
+        raise
+
+    new_offset = offset + written
+    updated = Upload.objects(id=upload.id, offset=offset, lease=token).update(
+        set__offset=new_offset, set__last_updated=datetime.utcnow(), unset__lease=1, unset__locked_until=1
+    )
+    if not updated:
+        _hashers.invalidate(str(upload.id))
+        abort(409)
+
+    if sha:
+        _hashers.set(str(upload.id), (new_offset, sha))
+    return _tus_response(Upload_Offset=new_offset)
+
+
+@uploads_bp.route('/<upload_id>/finalize', methods=['POST'])
+@login_required
+def finalize_upload(upload_id):
+    upload = _get_own_upload(upload_id)
+    if upload.status != 'pending':
+        abort(409)
+    if upload.offset != upload.length:
+        return _tus_response({"status": "error", "offset": upload.offset}, status=409,
+                             Upload_Offset=upload.offset)
+
+    data = request.get_json(silent=True) or request.form
+    target, target_id = data.get('target'), data.get('target_id')
+    if target == 'lesson':
+        document = Lesson.objects.get_or_404(id=target_id)
+        course = document.course
+    elif target == 'course':
+        document = course = Course.objects.get_or_404(id=target_id)
+    else:
+        abort(400)
+    if course.instructor != current_user:
+        abort(403)
+
+    cached = _hashers.get(str(upload.id))
+    source = partial_path(upload)
+    sha256 = cached[1].hexdigest() if cached and cached[0] == upload.length else file_sha256(source)
+    expected = data.get('sha256')
+    if expected and expected.lower() != sha256:
+        return jsonify({"status": "error", "message": "Checksum mismatch."}), 422
+
+    # Ab hi file public uploads folder mein jaati hai aur document se judti hai
+    filename = store_local_file(source, upload.folder, upload.filename, sha256)
+    field = 'video_filename' if upload.folder == 'videos' else 'resource_filename'
+    release_upload(upload.folder, getattr(document, field))
+    document.update(**{f'set__{field}': filename})
+    if target == 'lesson':
+        # Course.outline ka has_video / has_resource bhi sync rehna chahiye
+        setattr(document, field, filename)
+        Course.update_outline(course.id, document)
+
+    upload.update(set__status='complete', set__sha256=sha256, set__last_updated=datetime.utcnow())
+    _hashers.invalidate(str(upload.id))
+    return jsonify({"status": "success", "filename": filename, "sha256": sha256})
+
+
+def cleanup_abandoned_uploads(older_than):
+    """Delete pending uploads (and their .part files) untouched since `older_than`."""
+    removed = 0
+    for upload in Upload.objects(status='pending', last_updated__lt=older_than):
+        path = partial_path(upload)
+        if os.path.exists(path):
+            os.remove(path)
+        upload.delete()
+        removed += 1
+    # Finished uploads ke records bhi purane ho gaye toh hata do
+    Upload.objects(status='complete', last_updated__lt=older_than).delete()
+    return removed
@@ -0,0 +1,41 @@
+from app.models import Course, Lesson, prefetch
+from app.catalog import public_course_ids
+
+# Ranked full-text search: Course aur Lesson par weighted MongoDB text indexes
+# (see models.py). $text query hamesha index se chalti hai - regex scan kabhi nahi.
+
+MAX_QUERY_LENGTH = 100
+MAX_PAGE = 20
+
+
+def search_catalog(query, page=1, per_page=10):
+    """Return `{'courses': [...], 'lessons': [...], 'has_more': bool}` ranked by text score."""
+    query = (query or '').strip()[:MAX_QUERY_LENGTH]
+    if not query:
+        return {'courses': [], 'lessons': [], 'has_more': False}
+
+    page = max(1, min(page, MAX_PAGE))
+    skip = (page - 1) * per_page
+
+    courses = list(
+        Course.objects(is_active=True, is_hidden=False)
+        .search_text(query)
+        .only('title', 'description', 'price', 'instructor')
+        .order_by('$text_score')
+        .skip(skip).limit(per_page + 1)
+    )
+    # Sirf public courses ke lessons: filter query ke andar, taaki skip/limit aur
+    # has_more dono sahi rahein
+    lessons = prefetch(
+        Lesson.objects(course__in=public_course_ids()).search_text(query)
+        .only('title', 'course')
+        .order_by('$text_score')
+        .skip(skip).limit(per_page + 1),
+        'course'
+    )
+    has_more = len(courses) > per_page or len(lessons) > per_page
+    return {
+        'courses': prefetch(courses[:per_page], 'instructor'),
+        'lessons': lessons[:per_page],
+        'has_more': has_more,
+    }
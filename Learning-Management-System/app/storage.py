@@ -0,0 +1,196 @@
+import hashlib
+import os
+import shutil
+import time
+import uuid
+from collections import Counter as RefCounter
+from datetime import datetime, timedelta
+from flask import current_app
+from werkzeug.utils import secure_filename
+from app.images import RENDITION_DIR
+from app.models import Blob, Course, Lesson, User
+
+# Content-addressed upload store: static/uploads/<folder>/<sha256><ext>.
+# Same file do baar upload hui toh disk par dobara nahi likhi jaati, sirf
+# Blob.ref_count badhta hai. Unreferenced files `flask lms gc-uploads` hatata hai.
+
+CHUNK_SIZE = 1024 * 1024
+
+# (Document, field, folder) - har jagah jahan upload ka filename save hota hai
+FILE_REFERENCES = (
+    (Course, 'video_filename', 'videos'),
+    (Course, 'resource_filename', 'resources'),
+    (Lesson, 'video_filename', 'videos'),
+    (Lesson, 'resource_filename', 'resources'),
+    (User, 'signature_filename', 'signatures'),
+    (User, 'profile_pic', 'profile_pics'),
+)
+UPLOAD_FOLDERS = sorted({folder for _, _, folder in FILE_REFERENCES})
+
+
+def upload_folder_path(folder_name):
+    upload_path = os.path.join(current_app.root_path, 'static/uploads', folder_name)
+    if not os.path.exists(upload_path):
+        os.makedirs(upload_path)
+    return upload_path
+
+
+def _blob_name(sha256, original_name):
+    extension = os.path.splitext(secure_filename(original_name or ''))[1].lower()
+    return f"{sha256}{extension}"
+
+
+def _add_reference(folder, filename, sha256, size):
+    Blob.objects(folder=folder, filename=filename).update_one(
+        upsert=True,
+        inc__ref_count=1,
+        set__last_updated=datetime.utcnow(),
+        set_on_insert__sha256=sha256,
+        set_on_insert__size=size,
+        set_on_insert__date_created=datetime.utcnow(),
+    )
+
+
+def store_upload(file_data, folder_name):
+    """Save a werkzeug FileStorage by content hash; returns the stored filename."""
+    sha, size = hashlib.sha256(), 0
+    stream = file_data.stream
+    for block in iter(lambda: stream.read(CHUNK_SIZE), b''):
+        sha.update(block)
+        size += len(block)
+    stream.seek(0)
+
+    filename = _blob_name(sha.hexdigest(), file_data.filename)
+    target = os.path.join(upload_folder_path(folder_name), filename)
+    if not os.path.exists(target):
+        # Temp naam + rename, taaki adhoori file kabhi final naam par na dikhe
+        tmp_path = f"{target}.tmp-{uuid.uuid4().hex}"
+        file_data.save(tmp_path)
+        os.replace(tmp_path, target)
+
+    _add_reference(folder_name, filename, sha.hexdigest(), size)
+    return filename
+
+
+def store_local_file(path, folder_name, original_name, sha256):
+    """Move an already-hashed file (e.g. a finished chunked upload) into the store."""
+    filename = _blob_name(sha256, original_name)
+    target = os.path.join(upload_folder_path(folder_name), filename)
+    size = os.path.getsize(path)
+    if os.path.exists(target):
+        os.remove(path)  # duplicate content - write skip
+    else:
+        shutil.move(path, target)
+
+    _add_reference(folder_name, filename, sha256, size)
+    return filename
+
+
+def release_upload(folder_name, filename):
+    # File turant delete nahi hoti; ref_count 0 hone par gc-uploads hatayega
+    if filename:
+        Blob.objects(folder=folder_name, filename=filename).update_one(
+            dec__ref_count=1, set__last_updated=datetime.utcnow()
+        )
+
+
+def file_sha256(path):
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def adopt_legacy_files():
+    """Move timestamp-named uploads that documents still use into the blob store."""
+    adopted = 0
+    for document, field, folder in FILE_REFERENCES:
+        for doc in document.objects(**{f'{field}__ne': None}).only(field):
+            filename = getattr(doc, field)
+            if not filename or Blob.objects(folder=folder, filename=filename).first():
+                continue
+            path = os.path.join(upload_folder_path(folder), filename)
+            if not os.path.exists(path):
+                continue
+            # Copy karo (original sweep mein hategi), phir document ko naya naam do
+            sha256 = file_sha256(path)
+            tmp_path = f"{path}.tmp-{uuid.uuid4().hex}"
+            shutil.copyfile(path, tmp_path)
+            doc.update(**{f'set__{field}': store_local_file(tmp_path, folder, filename, sha256)})
+            adopted += 1
+    return adopted
+
+
+def collect_garbage(grace_seconds, purge_archived=False, dry_run=False):
+    """Mark-and-sweep: recount references, then delete unreferenced blobs and files.
+
+    Refcounts cascade deletes ya direct DB edits se drift ho sakte hain, isliye
+    sweep hamesha actual documents se dobara ginta hai.
+    """
+    archived_ids = list(Course.objects(is_active=False).scalar('id')) if purge_archived else []
+
+    live = RefCounter()
+    for document, field, folder in FILE_REFERENCES:
+        queryset = document.objects(**{f'{field}__ne': None})
+        if purge_archived and document is Course:
+            queryset = queryset.filter(is_active=True)
+        elif purge_archived and document is Lesson:
+            queryset = queryset.filter(course__nin=archived_ids)
+        for filename in queryset.scalar(field):
+            if filename:
+                live[(folder, filename)] += 1
+    if not purge_archived:
+        # Archived courses restore ho sakte hain - unki files bhi live hain
+        from app.archive import archived_file_references
+        for key in archived_file_references(FILE_REFERENCES):
+            live[key] += 1
+
+    stats = {'recounted': 0, 'blobs_removed': 0, 'files_removed': 0, 'bytes_freed': 0}
+    cutoff = datetime.utcnow() - timedelta(seconds=grace_seconds)
+
+    for blob in Blob.objects.only('folder', 'filename', 'ref_count', 'last_updated'):
+        refs = live[(blob.folder, blob.filename)]
+        if refs != blob.ref_count:
+            stats['recounted'] += 1
+            if not dry_run:
+                blob.update(set__ref_count=refs)
+        if refs == 0 and blob.last_updated < cutoff and not dry_run:
+            # Record hatao (sirf agar abhi bhi unreferenced hai); file neeche disk sweep mein jaayegi
+            if Blob.objects(id=blob.id, ref_count__lte=0).delete():
+                stats['blobs_removed'] += 1
+
+    # Disk sweep: jo file kisi document ya blob ki nahi hai (legacy duplicates bhi)
+    tracked = {(b['folder'], b['filename']) for b in Blob.objects.only('folder', 'filename').as_pymongo()}
+    file_cutoff = time.time() - grace_seconds
+    for folder in UPLOAD_FOLDERS:
+        folder_path = os.path.join(current_app.root_path, 'static/uploads', folder)
+        if not os.path.isdir(folder_path):
+            continue
+        for entry in os.scandir(folder_path):
+            key = (folder, entry.name)
+            if not entry.is_file() or key in live or key in tracked:
+                continue
+            if entry.stat().st_mtime > file_cutoff:
+                continue
+            stats['files_removed'] += 1
+            stats['bytes_freed'] += entry.stat().st_size
+            if not dry_run:
+                os.remove(entry.path)
+
+        # Image renditions (<source stem>-<name>.<ext>) source file ke saath hi jaate hain
+        rendition_path = os.path.join(folder_path, RENDITION_DIR)
+        if not os.path.isdir(rendition_path):
+            continue
+        kept_stems = {os.path.splitext(name)[0] for f, name in set(live) | tracked if f == folder}
+        for entry in os.scandir(rendition_path):
+            if not entry.is_file() or entry.name.rsplit('-', 1)[0] in kept_stems:
+                continue
+            if entry.stat().st_mtime > file_cutoff:
+                continue
+            stats['files_removed'] += 1
+            stats['bytes_freed'] += entry.stat().st_size
+            if not dry_run:
+                os.remove(entry.path)
+
+    return stats
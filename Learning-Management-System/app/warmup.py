@@ -0,0 +1,73 @@
+import json
+import subprocess
+import sys
+import time
+import mongoengine
+from flask_mongoengine.connection import create_connections, get_connection_settings
+from mongoengine import connection
+
+# Production startup helpers (see gunicorn.conf.py / wsgi.py):
+#  - master (preload): app + saare Jinja templates compile, fork ke baad har worker
+#    ko copy-on-write milte hain
+#  - har worker (post_fork): naya MongoClient (pymongo fork-safe nahi hai), pool
+#    kholna aur hot indexes ko ek baar chhoo lena - taaki pehli request yeh cost na de
+
+
+def warm_templates(app):
+    """Compile every template once (fills Jinja's cache and the bytecode cache on disk)."""
+    for name in app.jinja_env.list_templates(extensions=('html',)):
+        app.jinja_env.get_template(name)
+
+
+def reconnect_mongo(app):
+    """Drop clients inherited from the master and reconnect from MONGODB_SETTINGS."""
+    settings = get_connection_settings(app.config)
+    for each in settings if isinstance(settings, list) else [settings]:
+        mongoengine.disconnect(each['alias'])
+    create_connections(app.config)
+
+
+def warm_database(app):
+    """Open the pool (ping) and run each hot query once so its index pages are cached."""
+    from app.cli import hot_queries
+    with app.app_context():
+        connection.get_db().command('ping')  # server selection + pehla connection; baaki minPoolSize tak pymongo bharta hai
+        for _, queryset in hot_queries():
+            queryset.limit(1).first()
+
+
+def warm_up(app):
+    """Run all warm-up steps; returns {step: milliseconds}."""
+    timings = {}
+    for step, fn in (('templates', warm_templates), ('database', warm_database)):
+        start = time.perf_counter()
+        fn(app)
+        timings[step] = round((time.perf_counter() - start) * 1000, 1)
+    return timings
+
+
+def measure_startup(warm):
+    """Cold-start numbers for one fresh process (called via `python -m app.warmup`)."""
+    start = time.perf_counter()
+    from app import create_app
+    app = create_app()
+    result = {'create_app_ms': round((time.perf_counter() - start) * 1000, 1)}
+    if warm:
+        result['warm_up_ms'] = warm_up(app)
+
+    client = app.test_client()
+    for label in ('first_request_ms', 'second_request_ms'):
+        start = time.perf_counter()
+        client.get('/')
+        result[label] = round((time.perf_counter() - start) * 1000, 1)
+    return result
+
+
+def measure_in_subprocess(warm, cwd=None):
+    args = [sys.executable, '-m', 'app.warmup'] + (['--warm'] if warm else [])
+    output = subprocess.run(args, cwd=cwd, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+if __name__ == '__main__':
+    print(json.dumps(measure_startup(warm='--warm' in sys.argv)))
@@ -10,9 +10,10 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'default-dev-key-12345') 
     
     # --- MAIL CONFIGURATION ---
-    MAIL_SERVER = "smtp.gmail.com"
-    MAIL_PORT = 587
-    MAIL_USE_TLS = True
+    # Local testing: `python -m aiosmtpd -n -l localhost:8025` + MAIL_SERVER=localhost MAIL_PORT=8025 MAIL_USE_TLS=false
+    MAIL_SERVER = os.getenv('MAIL_SERVER', "smtp.gmail.com")
+    MAIL_PORT = int(os.getenv('MAIL_PORT', 587))
+    MAIL_USE_TLS = os.getenv('MAIL_USE_TLS', 'true').lower() == 'true'
     MAIL_USE_SSL = False
     
     MAIL_USERNAME = os.getenv('MAIL_USERNAME')
@@ -20,15 +21,99 @@ class Config:
     
     # Sender ka naam define karna zaroori hai (e.g. "LearnHub <email@gmail.com>")
     MAIL_DEFAULT_SENDER = (os.getenv('MAIL_SENDER_NAME', 'LearnHub Support'), os.getenv('MAIL_USERNAME'))
+
+    # Email outbox worker (`flask lms outbox-worker`)
+    OUTBOX_BATCH_SIZE = 50         # ek SMTP connection par kitne emails
+    OUTBOX_POLL_INTERVAL = 2       # seconds, jab queue khaali ho
+    OUTBOX_LEASE_SECONDS = 300     # crashed worker ke claimed emails itne baad wapas milte hain
+    OUTBOX_MAX_ATTEMPTS = 6
+    OUTBOX_BACKOFF_BASE = 30       # seconds; 30, 60, 120 ...
+    OUTBOX_BACKOFF_MAX = 3600
     
     # --- MONGODB CONFIGURATION ---
     # Atlas ke liye 'connect': False aur serverSelectionTimeoutMS zaroori hote hain
     MONGODB_SETTINGS = {
         'host': os.getenv('MONGODB_URI'),
         'connect': False, # Connection request tabhi bhejega jab database ki zaroorat ho
-        'serverSelectionTimeoutMS': 5000 # 5 seconds tak wait karega Atlas connect hone ka
+        'serverSelectionTimeoutMS': 5000, # 5 seconds tak wait karega Atlas connect hone ka
+        # Pool per worker process: gunicorn threads se thoda zyada (cursor/getMore ke liye)
+        'maxPoolSize': int(os.getenv('MONGODB_MAX_POOL_SIZE', 20)),
+        'minPoolSize': int(os.getenv('MONGODB_MIN_POOL_SIZE', 2)), # warm connections, pehli request socket nahi kholti
+        'maxIdleTimeMS': int(os.getenv('MONGODB_MAX_IDLE_TIME_MS', 300000)),
+        'waitQueueTimeoutMS': int(os.getenv('MONGODB_WAIT_QUEUE_TIMEOUT_MS', 2000)), # pool khatam = fail fast
     }
 
+    # --- PASSWORD HASHING ---
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 12)) # badalne par login pe rehash hota hai
+    BCRYPT_MAX_WORKERS = int(os.getenv('BCRYPT_MAX_WORKERS', 0)) or None # None = CPU cores
+    BCRYPT_QUEUE_TIMEOUT = 10 # seconds; isse zyada wait hua toh "server busy"
+
+    # --- STARTUP / TEMPLATES ---
+    # Compiled templates instance/jinja_cache mein (naye worker ko dobara compile nahi karna padta)
+    JINJA_BYTECODE_CACHE = os.getenv('JINJA_BYTECODE_CACHE', 'true').lower() == 'true'
+
     # Security settings for Session
     SESSION_COOKIE_SECURE = False  # Localhost ke liye False, Production par True hoga
-    REMEMBER_COOKIE_DURATION = 3600 # 1 hour tak login session rahega
\ No newline at end of file
+    REMEMBER_COOKIE_DURATION = 3600 # 1 hour tak login session rahega
+
+    # --- REVERSE PROXY ---
+    # App ke aage kitne proxies hain (nginx = 1). Set ho toh X-Forwarded-For/-Proto/-Host
+    # se client ka asli IP milta hai (rate limiting per IP isi par chalta hai).
+    # 0 = seedha internet se (headers ignore, warna koi bhi IP spoof kar sakta hai).
+    # Sirf tab set karo jab app tak sirf proxy pahunch sakta ho (gunicorn.conf.py: bind + FORWARDED_ALLOW_IPS)
+    TRUSTED_PROXY_COUNT = int(os.getenv('TRUSTED_PROXY_COUNT', 0))
+
+    # --- RATE LIMITING (token bucket: "capacity/seconds") ---
+    RATELIMIT_ENABLED = os.getenv('RATELIMIT_ENABLED', 'true').lower() == 'true'
+    # 'memory' = per worker; 'mongo' = sab workers shared (rate_limits TTL collection)
+    RATELIMIT_STORAGE = os.getenv('RATELIMIT_STORAGE', 'memory')
+    RATELIMIT_MAX_KEYS = 100000 # memory store isse zyada keys par sabse purane (LRU) buckets hata deta hai
+    RATE_LIMITS = {
+        'login': {'ip': '20/60', 'account': '5/300'},
+        'reset': {'ip': '5/300', 'account': '3/3600'},   # har reset ek email hai
+        'otp_send': {'account': '3/3600'},
+        'otp_verify': {'ip': '20/600', 'account': '5/600'}, # 6-digit OTP guessing
+    }
+
+    # --- CACHING ---
+    # load_user cache (per worker process)
+    USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', 2048))
+    USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', 300)) # seconds
+
+    # Public catalog fragments (home/explore); version Mongo se itne seconds mein refresh hota hai
+    CATALOG_VERSION_TTL = int(os.getenv('CATALOG_VERSION_TTL', 5))
+    CATALOG_CACHE_SIZE = 64
+    CATALOG_CACHE_TTL = 3600
+
+    # --- QUERY METRICS (/metrics) ---
+    QUERY_METRICS_ENABLED = os.getenv('QUERY_METRICS_ENABLED', 'true').lower() == 'true'
+    SLOW_QUERY_MS = int(os.getenv('SLOW_QUERY_MS', 100)) # 0 = slow query logging band
+    N_PLUS_ONE_THRESHOLD = 10 # ek request mein same query shape isse zyada baar = N+1 warning
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN') # set ho toh /metrics ko 'Authorization: Bearer <token>' chahiye
+
+    # --- PAGINATION (keyset) ---
+    COURSES_PER_PAGE = 24
+    API_MAX_PAGE_SIZE = 100
+
+    # --- UPLOADS ---
+    UPLOAD_MAX_SIZE = int(os.getenv('UPLOAD_MAX_SIZE', 4 * 1024 ** 3)) # 4 GB (chunked uploads)
+    UPLOAD_ABANDON_HOURS = 24 # itne ghante purane adhoore uploads cleanup mein hatenge
+    UPLOAD_CHUNK_LEASE_SECONDS = 300 # PATCH ka claim; ruka hua client itne baad offset chhod deta hai
+    ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', 30)) # soft-deleted course itne din baad *_archive collections mein
+
+    # --- IMAGE RENDITIONS (profile pics, signatures; Pillow zaroori) ---
+    IMAGE_WORKERS = int(os.getenv('IMAGE_WORKERS', 2)) # background process pool size
+    IMAGE_QUALITY = 80 # WebP/JPEG quality
+
+    # --- WATCH POSITIONS (video resume heartbeats) ---
+    POSITION_FLUSH_SECONDS = int(os.getenv('POSITION_FLUSH_SECONDS', 5)) # har worker itne seconds mein ek bulk_write
+    POSITION_BUFFER_MAX = 50000 # itni pending entries par turant flush
+    POSITION_HEARTBEAT_SECONDS = 10 # browser kitni der mein position bhejta hai
+
+    # --- MEDIA SERVING (/media) ---
+    MEDIA_MAX_AGE = 31536000 # 1 year; filenames content-unique hain
+    # nginx: internal location jo static/uploads ko point kare, e.g. '/_protected_media'.
+    # uploads/videos aur uploads/resources ko public /static location se serve mat karo
+    MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv('MEDIA_ACCEL_REDIRECT_PREFIX')
+    # Apache/lighttpd ke liye X-Sendfile
+    USE_X_SENDFILE = os.getenv('USE_X_SENDFILE', 'false').lower() == 'true'
@@ -0,0 +1,52 @@
+import multiprocessing
+import os
+
+# `gunicorn -c gunicorn.conf.py wsgi:app`
+# Har setting env se override ho sakti hai (e.g. GUNICORN_WORKERS=4)
+
+# Sirf loopback: nginx aage hai. 0.0.0.0 par kholna ho toh TRUSTED_PROXY_COUNT=0 rakho
+# (ya proxy ko hi port tak pahunch do) - warna koi bhi X-Forwarded-For se IP badal lega
+bind = os.getenv('GUNICORN_BIND', '127.0.0.1:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+# gthread: bcrypt aur Mongo I/O GIL chhodte hain, threads sasta concurrency dete hain.
+# MONGODB_MAX_POOL_SIZE isse kam nahi hona chahiye.
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+graceful_timeout = 30
+keepalive = 5
+# Memory leaks / fragmentation se bachne ke liye workers dheere dheere recycle
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 5000))
+max_requests_jitter = 500
+
+# App (aur compiled templates) master mein ek baar load; workers fork par share karte hain
+preload_app = True
+
+# nginx ke peeche: env mein TRUSTED_PROXY_COUNT=1 (app ka ProxyFix) explicitly set karo.
+# Yeh teen settings saath badalti hain: bind (sirf proxy pahunch sake), FORWARDED_ALLOW_IPS
+# (proxy ka address) aur TRUSTED_PROXY_COUNT. Direct clients ke saamne proxy count 0 hi rahe.
+forwarded_allow_ips = os.getenv('FORWARDED_ALLOW_IPS', '127.0.0.1')
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    # pymongo client fork-safe nahi hai: har worker naya client kholta hai, aur
+    # traffic lene se pehle pool + hot indexes warm karta hai
+    from wsgi import app
+    from app.warmup import reconnect_mongo, warm_database
+    reconnect_mongo(app)
+    try:
+        warm_database(app)
+    except Exception as e:  # DB abhi down hai toh bhi worker start ho; pehli request retry karegi
+        worker.log.warning("Database warm-up failed: %s", e)
+
+
+def worker_exit(server, worker):
+    # Pending watch positions ko flush karke hi band ho
+    from app.positions import position_buffer
+    try:
+        position_buffer.flush()
+    except Exception as e:
+        worker.log.warning("Position flush on exit failed: %s", e)
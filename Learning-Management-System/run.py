@@ -8,6 +8,7 @@ except Exception as e:
     sys.exit(1)
 
 if __name__ == "__main__":
+    # Sirf development ke liye; production: `gunicorn -c gunicorn.conf.py wsgi:app`
     # host='0.0.0.0' karne se ye network par visible ho jayega
     # port=5000 default hota hai, aap badal bhi sakte hain
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,77 @@
+# Test deps: pytest, aiosmtpd (local SMTP sink), mongomock (in-memory MongoDB)
+import socket
+import pytest
+from config import Config
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class SmtpSink:
+    """aiosmtpd handler: accepts everything except addresses in `reject`."""
+
+    def __init__(self):
+        self.messages = []
+        self.reject = set()
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address in self.reject:
+            return '550 5.1.1 Mailbox unavailable'
+        envelope.rcpt_tos.append(address)
+        return '250 OK'
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return '250 Message accepted for delivery'
+
+
+@pytest.fixture(scope='session')
+def smtp_sink():
+    controller_module = pytest.importorskip('aiosmtpd.controller')
+    sink = SmtpSink()
+    controller = controller_module.Controller(sink, hostname='127.0.0.1', port=free_port())
+    controller.start()
+    yield sink, controller.port
+    controller.stop()
+
+
+@pytest.fixture(scope='session')
+def app(smtp_sink):
+    _, port = smtp_sink
+    mongomock = pytest.importorskip('mongomock')
+
+    # .env ka MONGODB_URI (Atlas) kabhi use nahi hota: in-memory mongomock
+    class TestConfig(Config):
+        TESTING = True
+        SECRET_KEY = 'test'
+        MONGODB_SETTINGS = {'host': 'mongodb://localhost/lms_test', 'mongo_client_class': mongomock.MongoClient}
+        MAIL_SERVER = '127.0.0.1'
+        MAIL_PORT = port
+        MAIL_USE_TLS = False
+        MAIL_SUPPRESS_SEND = False  # TESTING par flask_mail warna kuch nahi bhejta
+        MAIL_USERNAME = None
+        MAIL_PASSWORD = None
+        MAIL_DEFAULT_SENDER = ('LearnHub Support', 'support@learnhub.test')
+        JINJA_BYTECODE_CACHE = False
+        RATELIMIT_ENABLED = False
+        QUERY_METRICS_ENABLED = False
+
+    from app import create_app
+    return create_app(TestConfig)
+
+
+@pytest.fixture
+def app_context(app, smtp_sink):
+    from app import user_cache
+    from app.models import OutboxEmail, User
+    sink, _ = smtp_sink
+    sink.messages.clear()
+    sink.reject.clear()
+    with app.app_context():
+        yield
+        OutboxEmail.drop_collection()
+        User.drop_collection()
+        user_cache.clear()
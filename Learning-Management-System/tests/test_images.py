@@ -0,0 +1,55 @@
+import os
+import shutil
+import pytest
+from app.images import image_pipeline
+
+NAME = 'b' * 64 + '.jpg'
+
+
+@pytest.fixture
+def photo(app):
+    Image = pytest.importorskip('PIL.Image')
+    folder = os.path.join(app.static_folder, 'uploads', 'profile_pics')
+    os.makedirs(folder, exist_ok=True)
+    image = Image.new('RGB', (500, 400), 'red')
+    exif = image.getexif()
+    exif[0x8825] = {2: (28.0, 36.0, 0.0)}  # GPSInfo
+    image.save(os.path.join(folder, NAME), exif=exif)
+    yield Image
+    shutil.rmtree(folder)
+
+
+def test_original_upload_is_not_served(app, photo):
+    client = app.test_client()
+    assert client.get(f'/static/uploads/profile_pics/{NAME}').status_code == 404
+    assert client.get(f'/static/uploads/profile_pics/./{NAME}').status_code == 404
+
+
+def test_rendition_is_resized_and_metadata_free(app, photo):
+    with app.test_request_context():
+        url = image_pipeline.image_url('profile_pics', NAME, 'thumb')
+    assert url.endswith('/renditions/' + 'b' * 64 + '-thumb.jpg')
+
+    response = app.test_client().get(url)
+    assert response.status_code == 200
+    path = os.path.join(image_pipeline._out_dir('profile_pics'), os.path.basename(url))
+    with photo.open(path) as rendition:
+        assert rendition.size == (96, 96)
+        assert not dict(rendition.getexif())
+
+
+def test_picture_offers_webp_with_jpeg_fallback(app, photo):
+    from flask import render_template_string
+    with app.test_request_context():
+        html = render_template_string(
+            "{% from 'partials/picture.html' import picture %}{{ picture('profile_pics', name, 'medium') }}",
+            name=NAME,
+        )
+    assert '-medium.jpg"' in html
+    if image_pipeline.webp:
+        assert '<source type="image/webp"' in html
+
+
+def test_missing_source_gives_no_url(app):
+    with app.test_request_context():
+        assert image_pipeline.image_url('profile_pics', 'c' * 64 + '.jpg', 'thumb') == ''
@@ -0,0 +1,50 @@
+import os
+import pytest
+from app.models import Course, Enrollment, User
+
+NAME = 'a' * 64 + '.mp4'
+
+
+@pytest.fixture
+def video(app, app_context):
+    folder = os.path.join(app.root_path, 'static/uploads/videos')
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, NAME)
+    with open(path, 'wb') as f:
+        f.write(b'video bytes')
+    instructor = User(username='teacher', email='teacher@example.com', password='x', role='instructor').save()
+    course = Course(title='Course', description='d', instructor=instructor, video_filename=NAME).save()
+    yield course
+    os.remove(path)
+    Course.drop_collection()
+    Enrollment.drop_collection()
+
+
+def login(client, user):
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user.id)
+        session['_fresh'] = True
+
+
+@pytest.mark.parametrize('path', [
+    f'/static/uploads/videos/{NAME}',
+    f'/static/uploads/./videos/{NAME}',
+    f'/static/uploads//videos/{NAME}',
+])
+def test_static_route_does_not_serve_media(app, video, path):
+    assert app.test_client().get(path).status_code == 404
+
+
+def test_media_requires_enrollment(app, video):
+    student = User(username='student', email='student@example.com', password='x').save()
+    client = app.test_client()
+    login(client, student)
+    url = f'/media/{video.id}/videos/{NAME}'
+
+    assert client.get(url).status_code == 403
+
+    Enrollment(student=student, course=video).save()
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.data == b'video bytes'
+    assert response.headers['ETag'] == '"' + 'a' * 64 + '"'
@@ -0,0 +1,67 @@
+from datetime import datetime
+from app.models import OutboxEmail, User
+from app.outbox import drain_outbox, enqueue_email
+from tests.conftest import free_port
+
+
+def test_batch_is_delivered_to_smtp(app_context, smtp_sink):
+    sink, _ = smtp_sink
+    enqueue_email('Welcome', ['one@example.com'], 'Hello one')
+    enqueue_email('Welcome', ['two@example.com'], 'Hello two')
+
+    assert drain_outbox() == (2, 0)
+    assert sorted(m.rcpt_tos[0] for m in sink.messages) == ['one@example.com', 'two@example.com']
+    assert OutboxEmail.objects(status='sent').count() == 2
+
+
+def test_smtp_rejection_is_retried_with_backoff(app_context, smtp_sink):
+    sink, _ = smtp_sink
+    sink.reject.add('gone@example.com')
+    email = enqueue_email('Welcome', ['gone@example.com'], 'Hello')
+
+    assert drain_outbox() == (0, 1)
+    email.reload()
+    assert email.status == 'pending'
+    assert email.attempts == 1
+    assert email.next_attempt_at > datetime.utcnow()
+    assert drain_outbox() == (0, 0)  # backoff khatam hone tak dobara claim nahi hota
+
+
+def test_bad_message_fails_without_blocking_the_batch(app_context, smtp_sink):
+    sink, _ = smtp_sink
+    poison = enqueue_email('Verify', ['victim@example.com\r\nBcc: everyone@example.com'], 'Hi')
+    good = enqueue_email('Verify', ['ok@example.com'], 'Hi')
+
+    assert drain_outbox() == (1, 1)
+    poison.reload()
+    good.reload()
+    assert poison.status == 'failed'
+    assert poison.attempts == 1
+    assert good.status == 'sent'
+    assert [m.rcpt_tos for m in sink.messages] == [['ok@example.com']]
+    assert OutboxEmail.objects(status='sending').count() == 0
+
+
+def test_unreachable_server_requeues_the_batch(app, app_context, monkeypatch):
+    monkeypatch.setattr(app.extensions['mail'], 'port', free_port())  # yahan koi nahi sun raha
+    enqueue_email('Welcome', ['one@example.com'], 'Hello')
+    enqueue_email('Welcome', ['two@example.com'], 'Hello')
+
+    assert drain_outbox() == (0, 2)
+    assert [e.attempts for e in OutboxEmail.objects(status='pending')] == [1, 1]
+
+
+def test_email_change_rejects_invalid_address(app, app_context):
+    user = User(username='teacher', email='teacher@example.com', password='x', role='instructor').save()
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user.id)
+        session['_fresh'] = True
+
+    response = client.post('/dashboard/instructor/profile', data={
+        'request_email_change': '1', 'email': 'new@example.com\r\nBcc: everyone@example.com',
+    })
+
+    assert response.status_code == 302
+    assert OutboxEmail.objects.count() == 0
+    assert User.objects.get(id=user.id).pending_new_email is None
@@ -0,0 +1,47 @@
+import pytest
+from app.models import Course, Enrollment, Lesson, User, UserProgress
+
+
+@pytest.fixture
+def legacy_course(app_context):
+    # Outline / lesson_count se pehle bana course: sirf lessons collection mein data
+    instructor = User(username='teacher', email='teacher@example.com', password='x', role='instructor').save()
+    student = User(username='student', email='student@example.com', password='x').save()
+    course = Course(title='Legacy', description='d', instructor=instructor).save()
+    lessons = [Lesson(title=f'Lesson {i}', content='c', course=course).save() for i in (1, 2)]
+    Enrollment(student=student, course=course).save()
+    yield course, student, lessons
+    for document in (Course, Lesson, Enrollment, UserProgress):
+        document.drop_collection()
+
+
+def login(client, user):
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user.id)
+        session['_fresh'] = True
+
+
+def test_view_course_builds_missing_outline(app, legacy_course):
+    course, student, _ = legacy_course
+    client = app.test_client()
+    login(client, student)
+
+    response = client.get(f'/courses/{course.id}')
+
+    assert response.status_code == 200
+    assert b'Lesson 1' in response.data and b'Lesson 2' in response.data
+    course.reload()
+    assert course.lesson_count == 2
+    assert [entry.title for entry in course.outline] == ['Lesson 1', 'Lesson 2']
+
+
+def test_complete_lesson_counts_legacy_lessons(app, legacy_course):
+    course, student, lessons = legacy_course
+    client = app.test_client()
+    login(client, student)
+
+    first = client.post(f'/courses/lesson/{lessons[0].id}/complete').get_json()
+    second = client.post(f'/courses/lesson/{lessons[1].id}/complete').get_json()
+
+    assert first['percent'] == 50
+    assert second['percent'] == 100
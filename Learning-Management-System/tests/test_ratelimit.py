@@ -0,0 +1,23 @@
+from app.ratelimit import LOCK_STRIPES, MemoryStore
+
+
+def test_bucket_allows_capacity_then_rejects():
+    store = MemoryStore()
+    results = [store.hit('login:ip:1.2.3.4', 3, 3 / 60) for _ in range(4)]
+
+    assert [allowed for allowed, _ in results] == [True, True, True, False]
+    assert 0 < results[-1][1] <= 20
+
+
+def test_key_flood_stays_bounded_and_keeps_recent_buckets():
+    store = MemoryStore(max_keys=LOCK_STRIPES * 10)
+    for _ in range(3):
+        store.hit('login:account:victim', 3, 3 / 300)
+
+    for i in range(LOCK_STRIPES * 100):
+        store.hit(f'login:ip:10.0.{i // 256}.{i % 256}', 3, 3 / 60)
+        if i % 5 == 0:
+            store.hit('login:account:victim', 3, 3 / 300)  # abhi bhi active - evict nahi hona chahiye
+
+    assert sum(len(buckets) for _, buckets in store._stripes) <= LOCK_STRIPES * 10
+    assert store.hit('login:account:victim', 3, 3 / 300)[0] is False
@@ -0,0 +1,63 @@
+import hashlib
+import os
+from datetime import datetime, timedelta
+import pytest
+from app.models import Upload, User
+from app.routes.uploads import partial_path
+
+
+@pytest.fixture
+def client(app, app_context):
+    instructor = User(username='teacher', email='teacher@example.com', password='x', role='instructor').save()
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(instructor.id)
+        session['_fresh'] = True
+    yield client
+    for upload in Upload.objects:
+        if os.path.exists(partial_path(upload)):
+            os.remove(partial_path(upload))
+    Upload.drop_collection()
+
+
+def create(client, length):
+    response = client.post('/uploads/', json={'folder': 'videos', 'filename': 'a.mp4'},
+                           headers={'Upload-Length': str(length)})
+    assert response.status_code == 201
+    return Upload.objects.get(id=response.get_json()['id'])
+
+
+def patch(client, upload, offset, body):
+    return client.patch(f'/uploads/{upload.id}', data=body, headers={'Upload-Offset': str(offset)})
+
+
+def test_chunks_advance_offset_and_release_lease(client):
+    upload = create(client, 6)
+
+    assert patch(client, upload, 0, b'abc').headers['Upload-Offset'] == '3'
+    assert patch(client, upload, 3, b'def').headers['Upload-Offset'] == '6'
+
+    upload.reload()
+    assert upload.offset == 6 and upload.lease is None
+    with open(partial_path(upload), 'rb') as f:
+        assert hashlib.sha256(f.read()).hexdigest() == hashlib.sha256(b'abcdef').hexdigest()
+
+
+def test_parallel_patch_at_same_offset_does_not_write(client):
+    upload = create(client, 6)
+    patch(client, upload, 0, b'abc')
+    # Doosri request ne offset 3 claim kar rakha hai (abhi stream kar rahi hai)
+    Upload.objects(id=upload.id).update(set__lease='other', set__locked_until=datetime.utcnow() + timedelta(minutes=5))
+
+    response = patch(client, upload, 3, b'XYZ')
+
+    assert response.status_code == 409
+    with open(partial_path(upload), 'rb') as f:
+        assert f.read() == b'abc'
+
+
+def test_expired_lease_can_be_taken_over(client):
+    upload = create(client, 3)
+    Upload.objects(id=upload.id).update(set__lease='crashed', set__locked_until=datetime.utcnow() - timedelta(seconds=1))
+
+    assert patch(client, upload, 0, b'abc').status_code == 204
@@ -0,0 +1,9 @@
+from app import create_app
+from app.warmup import warm_templates
+
+# Production entry point: `gunicorn -c gunicorn.conf.py wsgi:app`
+# (run.py sirf local development ke liye hai)
+app = create_app()
+
+# preload_app = True: yeh master mein ek baar chalta hai, workers fork par inherit karte hain
+warm_templates(app)